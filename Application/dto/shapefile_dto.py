@@ -1,3 +1,5 @@
+from typing import Optional
+
 from pydantic import BaseModel
 
 class ShapefileUploadResultDTO(BaseModel):
@@ -7,3 +9,21 @@ class ShapefileUploadResultDTO(BaseModel):
     database_table: str
     status: str
     geoserver: dict
+    import_report: Optional[dict] = None
+
+class ReconcileReportDTO(BaseModel):
+    workspace: str
+    datastore: str
+    dry_run: bool
+    summary: dict
+    timings: dict
+    layers: list[dict]
+    check_failed: list[dict]
+    orphans: list[str]
+
+class ShapefileInspectionDTO(BaseModel):
+    archive_sha256: str
+    layers: list[dict]
+    warnings: list[str]
+    cached: bool
+    elapsed_ms: float
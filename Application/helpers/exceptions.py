@@ -1,6 +1,8 @@
 # Application/exceptions.py
 from typing import Optional
 
+from Entities.circuit_breaker import CircuitOpenError  # reexportado para a camada de apresentação
+
 class GeoServerError(Exception):
     def __init__(self, *, status_code: int, method: str, url: str, response_text: str | None, message: str):
         self.status_code = status_code
@@ -20,3 +22,8 @@ class GeoServerError(Exception):
 class ServiceError(Exception):
     """Erro de serviço interno (domínio), para encapsular erros de etapas do fluxo."""
     pass
+
+
+class LayerNotFoundError(ServiceError):
+    """Layer (tabela) inexistente no schema configurado."""
+    pass
@@ -0,0 +1,62 @@
+# Application/helpers/lru_cache.py
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+
+class LruCache:
+    """
+    Cache LRU limitado e thread-safe (endpoints sync rodam no threadpool do uvicorn).
+    """
+
+    def __init__(self, max_items: int = 1024):
+        self._max_items = max(1, int(max_items))
+        self._items: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            if key not in self._items:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return self._items[key]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self._max_items:
+                self._items.popitem(last=False)
+
+    def pop(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            return self._items.pop(key, None)
+
+    def evict_where(self, predicate: Callable[[Hashable], bool]) -> int:
+        """Remove todas as chaves que satisfazem o predicado; retorna quantas saíram."""
+        with self._lock:
+            keys = [k for k in self._items if predicate(k)]
+            for k in keys:
+                del self._items[k]
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "items": len(self._items),
+            "max_items": self._max_items,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else None,
+        }
@@ -0,0 +1,285 @@
+# Application/helpers/profiler.py
+import cProfile
+import functools
+import inspect
+import io
+import json
+import logging
+import pstats
+import re
+import shutil
+import threading
+import time
+import tracemalloc
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterator, Optional
+
+_log = logging.getLogger("fauno.profiling")
+
+# sessão sem meta.json (em andamento) só é podada depois de abandonada por tanto tempo
+_STALE_SESSION_SECONDS = 24 * 3600
+
+# sessão ativa no request atual; sem sessão, profile_section é só um ContextVar.get()
+_session: ContextVar[Optional["ProfileSession"]] = ContextVar("fauno_profile_session", default=None)
+
+# seções abertas no contexto atual (por sessão/corrotina, não por thread): (profiler, thread)
+_stack: ContextVar[tuple] = ContextVar("fauno_profile_stack", default=())
+
+# profiler ligado em cada thread: o hook do cProfile é por thread e só um fica ativo
+_tls = threading.local()
+
+_PROFILE_ID = re.compile(r"^\d{8}T\d{12}-[0-9a-f]{6}$")
+_FILE_NAME = re.compile(r"^[\w.-]+$")
+
+
+class ProfileSession:
+    def __init__(self, directory: Path, label: str, trigger: str, top_allocations: int):
+        self.id = directory.name
+        self.directory = directory
+        self.label = label
+        self.trigger = trigger
+        self.top_allocations = top_allocations
+        self.started_at = datetime.now(timezone.utc)
+        self.sections: list[dict] = []
+        self._names: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _stem(self, name: str) -> str:
+        with self._lock:
+            n = self._names[name] = self._names.get(name, 0) + 1
+        return name if n == 1 else f"{name}-{n}"
+
+    def write_section(
+        self,
+        name: str,
+        profiler: Optional[cProfile.Profile],
+        before: Optional[tracemalloc.Snapshot],
+        after: Optional[tracemalloc.Snapshot],
+        elapsed_ms: float,
+    ) -> None:
+        stem = self._stem(name)
+        if profiler is not None:
+            profiler.dump_stats(str(self.directory / f"{stem}.pstats"))
+            out = io.StringIO()
+            pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(40)
+            (self.directory / f"{stem}.txt").write_text(out.getvalue(), encoding="utf-8")
+
+        allocations = None
+        if before is not None and after is not None:
+            top = after.compare_to(before, "lineno")[: self.top_allocations]
+            allocations = [str(stat) for stat in top]
+            (self.directory / f"{stem}-alloc.txt").write_text("\n".join(allocations) + "\n", encoding="utf-8")
+
+        with self._lock:
+            self.sections.append({
+                "name": name,
+                "file_stem": stem,
+                "thread": threading.current_thread().name,
+                "elapsed_ms": round(elapsed_ms, 1),
+                # False: thread já perfilada por outra sessão, só o tempo foi medido
+                "cpu_profile": profiler is not None,
+                "top_allocations": allocations[:5] if allocations else None,
+            })
+
+    def write_meta(self, elapsed_ms: float, error: Optional[str]) -> None:
+        meta = {
+            "id": self.id,
+            "label": self.label,
+            "trigger": self.trigger,
+            "started_at": self.started_at.isoformat(),
+            "elapsed_ms": round(elapsed_ms, 1),
+            "error": error,
+            "sections": self.sections,
+        }
+        (self.directory / "meta.json").write_text(json.dumps(meta, indent=2), encoding="utf-8")
+
+
+@contextmanager
+def profile_section(name: str) -> Iterator[None]:
+    """
+    Roda o bloco sob cProfile (+ diff de tracemalloc) quando há sessão de
+    profiling ativa no contexto; caso contrário não faz nada.
+    Em código async o profiler cobre também outras corrotinas que rodarem
+    no mesmo loop enquanto a seção estiver aberta; o trabalho pesado vai
+    para o pool de banco (run_db), que abre uma seção própria na thread.
+    """
+    session = _session.get()
+    if session is None:
+        yield
+        return
+
+    thread = threading.get_ident()
+    stack = _stack.get()
+    # só pausa a seção externa se ela for deste contexto e desta thread
+    parent = stack[-1][0] if stack and stack[-1][1] == thread else None
+    before = tracemalloc.take_snapshot() if tracemalloc.is_tracing() else None
+    profiler = None
+    # thread já perfilada por outra sessão (outra corrotina no mesmo loop): não
+    # troca o hook dela, a seção mede só o tempo
+    if getattr(_tls, "active", None) in (None, parent):
+        if parent is not None:
+            parent.disable()
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+            _tls.active = profiler
+        except ValueError:
+            # outra ferramenta de profiling ativa na thread
+            profiler = None
+            if parent is not None:
+                parent.enable()
+    token = _stack.set(stack + ((profiler, thread),))
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if profiler is not None:
+            profiler.disable()
+            _tls.active = None
+            if parent is not None:
+                parent.enable()
+                _tls.active = parent
+        _stack.reset(token)
+        # falha de I/O do profiling nunca derruba o upload perfilado
+        try:
+            after = tracemalloc.take_snapshot() if before is not None and tracemalloc.is_tracing() else None
+            session.write_section(name, profiler, before, after, elapsed_ms)
+        except Exception:
+            _log.warning("falha ao gravar a seção '%s' do profile %s", name, session.id, exc_info=True)
+
+
+def profiled(name: str):
+    """Decorator de profile_section para métodos sync e async."""
+    def decorator(fn):
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with profile_section(name):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with profile_section(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class ProfileStore:
+    """
+    Diretório com uma pasta por sessão de profiling ({id}/meta.json, *.pstats,
+    *.txt e *-alloc.txt), mantendo só as `retention` sessões mais recentes.
+    """
+
+    def __init__(self, root: str, retention: int = 50, top_allocations: int = 25):
+        self._root = Path(root)
+        self._retention = max(1, retention)
+        self._top_allocations = top_allocations
+        self._lock = threading.Lock()
+        self._tracing_users = 0
+        self._started_tracing = False
+
+    def _acquire_tracemalloc(self) -> None:
+        with self._lock:
+            if self._tracing_users == 0 and not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracing = True
+            self._tracing_users += 1
+
+    def _release_tracemalloc(self) -> None:
+        with self._lock:
+            self._tracing_users -= 1
+            # só para o tracemalloc que nós mesmos ligamos (ex.: não o de PYTHONTRACEMALLOC)
+            if self._tracing_users == 0 and self._started_tracing:
+                tracemalloc.stop()
+                self._started_tracing = False
+
+    @contextmanager
+    def session(self, label: str, trigger: str) -> Iterator[Optional[ProfileSession]]:
+        """Sessão de profiling; None (bloco roda sem profiling) se o diretório não puder ser criado."""
+        profile_id = f"{datetime.now(timezone.utc):%Y%m%dT%H%M%S%f}-{uuid.uuid4().hex[:6]}"
+        directory = self._root / profile_id
+        try:
+            directory.mkdir(parents=True, exist_ok=True)
+        except OSError:
+            _log.warning("profiling desligado para este request: sem acesso a %s", directory, exc_info=True)
+            yield None
+            return
+        session = ProfileSession(directory, label, trigger, self._top_allocations)
+
+        token = _session.set(session)
+        self._acquire_tracemalloc()
+        started = time.perf_counter()
+        error = None
+        try:
+            with profile_section(label):
+                yield session
+        except BaseException as ex:
+            error = f"{type(ex).__name__}: {ex}"[:500]
+            raise
+        finally:
+            _session.reset(token)
+            self._release_tracemalloc()
+            try:
+                session.write_meta((time.perf_counter() - started) * 1000, error)
+                self._prune()
+            except Exception:
+                _log.warning("falha ao finalizar o profile %s", session.id, exc_info=True)
+
+    def _session_dirs(self) -> list[Path]:
+        if not self._root.exists():
+            return []
+        return sorted(
+            (p for p in self._root.iterdir() if p.is_dir() and _PROFILE_ID.match(p.name)),
+            key=lambda p: p.name,
+            reverse=True,
+        )
+
+    def _prune(self) -> None:
+        # retenção conta só sessões concluídas (com meta.json): uma sessão mais antiga
+        # ainda em andamento não pode ter o diretório apagado debaixo dela
+        finished = [d for d in self._session_dirs() if (d / "meta.json").exists()]
+        for old in finished[self._retention:]:
+            shutil.rmtree(old, ignore_errors=True)
+        now = time.time()
+        for d in self._session_dirs():
+            if not (d / "meta.json").exists() and now - d.stat().st_mtime > _STALE_SESSION_SECONDS:
+                shutil.rmtree(d, ignore_errors=True)
+
+    def list(self) -> list[dict]:
+        result = []
+        for d in self._session_dirs():
+            try:
+                meta = json.loads((d / "meta.json").read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                continue  # sessão ainda em andamento
+            meta["files"] = [
+                {"name": f.name, "size_bytes": f.stat().st_size}
+                for f in sorted(d.iterdir()) if f.is_file()
+            ]
+            result.append(meta)
+        return result
+
+    def resolve_file(self, profile_id: str, filename: str) -> Optional[Path]:
+        # nomes validados antes de montar o caminho: nada de ../
+        if not _PROFILE_ID.match(profile_id) or not _FILE_NAME.match(filename):
+            return None
+        path = self._root / profile_id / filename
+        return path if path.is_file() else None
+
+
+_instances: dict[tuple, ProfileStore] = {}
+
+
+def get_profile_store(root: str, retention: int, top_allocations: int) -> ProfileStore:
+    """Uma instância por processo (o refcount do tracemalloc precisa ser único)."""
+    key = (root, retention, top_allocations)
+    if key not in _instances:
+        _instances[key] = ProfileStore(root=root, retention=retention, top_allocations=top_allocations)
+    return _instances[key]
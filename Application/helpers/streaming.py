@@ -0,0 +1,29 @@
+# Application/helpers/streaming.py
+import shutil
+import zlib
+from pathlib import Path
+from typing import Iterable, Iterator
+
+
+def gzip_stream(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    """Comprime em gzip sob demanda, sem acumular o corpo inteiro em memória."""
+    comp = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        out = comp.compress(chunk)
+        if out:
+            yield out
+    yield comp.flush()
+
+
+def file_chunks(path: Path, chunk_size: int = 1024 * 1024, cleanup_dir: Path | None = None) -> Iterator[bytes]:
+    """Lê o arquivo em blocos; remove `cleanup_dir` ao final (ou se o cliente desconectar)."""
+    try:
+        with path.open("rb") as f:
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+    finally:
+        if cleanup_dir is not None:
+            shutil.rmtree(cleanup_dir, ignore_errors=True)
@@ -0,0 +1,104 @@
+# Application/helpers/tile_cache.py
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional
+
+from Application.helpers.lru_cache import LruCache
+
+
+def make_etag(data: bytes) -> str:
+    return '"' + hashlib.sha1(data).hexdigest() + '"'
+
+
+class TileCache:
+    """
+    Cache de tiles MVT em dois níveis: LRU em memória + disco.
+
+    Cada layer tem um arquivo marcador (`.version`) no disco; a invalidação
+    apaga o diretório da layer e recria o marcador. Como a versão entra na
+    chave do LRU, os outros workers do uvicorn deixam de enxergar tiles
+    antigos sem precisar de comunicação entre processos.
+    """
+
+    _VERSION_FILE = ".version"
+
+    def __init__(self, root: str, max_items: int = 2048):
+        self._root = Path(root)
+        self._root.mkdir(parents=True, exist_ok=True)
+        self._memory = LruCache(max_items=max_items)
+
+    # --- helpers ---
+    def _layer_dir(self, schema: str, layer: str) -> Path:
+        return self._root / schema / layer
+
+    def _tile_path(self, schema: str, layer: str, z: int, x: int, y: int, variant: str) -> Path:
+        return self._layer_dir(schema, layer) / str(z) / str(x) / f"{y}-{variant}.mvt"
+
+    def _layer_version(self, schema: str, layer: str) -> int:
+        try:
+            return os.stat(self._layer_dir(schema, layer) / self._VERSION_FILE).st_mtime_ns
+        except FileNotFoundError:
+            return 0
+
+    # --- API ---
+    def get(self, schema: str, layer: str, z: int, x: int, y: int, variant: str) -> Optional[tuple[bytes, str]]:
+        version = self._layer_version(schema, layer)
+        key = (schema, layer, version, z, x, y, variant)
+
+        hit = self._memory.get(key)
+        if hit is not None:
+            return hit
+
+        path = self._tile_path(schema, layer, z, x, y, variant)
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            return None
+
+        entry = (data, make_etag(data))
+        self._memory.put(key, entry)
+        return entry
+
+    def put(self, schema: str, layer: str, z: int, x: int, y: int, variant: str, data: bytes) -> tuple[bytes, str]:
+        version = self._layer_version(schema, layer)
+        entry = (data, make_etag(data))
+        self._memory.put((schema, layer, version, z, x, y, variant), entry)
+
+        # escrita atômica: outro worker nunca lê tile pela metade
+        path = self._tile_path(schema, layer, z, x, y, variant)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except OSError:
+            # cache em disco é best-effort; o tile continua no LRU
+            Path(tmp).unlink(missing_ok=True)
+        return entry
+
+    def invalidate_layer(self, schema: str, layer: str) -> None:
+        layer_dir = self._layer_dir(schema, layer)
+        shutil.rmtree(layer_dir, ignore_errors=True)
+        layer_dir.mkdir(parents=True, exist_ok=True)
+        marker = layer_dir / self._VERSION_FILE
+        marker.write_text(str(time.time_ns()), encoding="utf-8")
+        self._memory.evict_where(lambda k: k[0] == schema and k[1] == layer)
+
+    def stats(self) -> dict:
+        return {"memory": self._memory.stats(), "root": str(self._root)}
+
+
+_instances: dict[tuple[str, int], TileCache] = {}
+
+
+def get_tile_cache(root: str, max_items: int) -> TileCache:
+    """Uma instância por processo (os services são recriados a cada request)."""
+    key = (root, max_items)
+    if key not in _instances:
+        _instances[key] = TileCache(root=root, max_items=max_items)
+    return _instances[key]
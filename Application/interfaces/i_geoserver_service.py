@@ -1,15 +1,24 @@
 from abc import ABC, abstractmethod
+from typing import Optional
 
 class IGeoServerService(ABC):
     @abstractmethod
-    def create_style_registration(self, name: str, workspace: str, filename: str) -> None: ...
+    def create_style_registration(self, name: str, workspace: str, filename: str, assume_missing: bool = False) -> None: ...
     @abstractmethod
     def upload_style_sld(self, name: str, workspace: str, sld_xml: str) -> None: ...
     @abstractmethod
-    def create_featuretype(self, workspace: str, datastore: str, layer: str) -> None: ...
+    def create_featuretype(self, workspace: str, datastore: str, layer: str, assume_missing: bool = False) -> None: ...
     @abstractmethod
     def set_default_style(self, layer: str, workspace: str, style: str) -> None: ...
     @abstractmethod
     def get_style_sld_length(self, workspace: str, name: str) -> int | None: ...
     @abstractmethod
     def check_layer_status(self, layer: str, workspace: str) -> int: ...
+    @abstractmethod
+    def list_featuretypes(self, workspace: str, datastore: str) -> set[str]: ...
+    @abstractmethod
+    def list_styles(self, workspace: str) -> set[str]: ...
+    @abstractmethod
+    def list_layers(self, workspace: str) -> set[str]: ...
+    @abstractmethod
+    def get_default_style(self, layer: str, workspace: str) -> Optional[str]: ...
@@ -1,4 +1,6 @@
+from typing import Optional
+
 from Entities.shapefile_entity import ShapefileEntity
 
-def to_entity(name: str, path: str, srid: int = 4674) -> ShapefileEntity:
-    return ShapefileEntity(name=name, path=path, srid=srid)
+def to_entity(name: str, path: str, srid: int = 4674, source_srid: Optional[int] = None) -> ShapefileEntity:
+    return ShapefileEntity(name=name, path=path, srid=srid, source_srid=source_srid)
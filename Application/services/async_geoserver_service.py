@@ -0,0 +1,115 @@
+# Application/services/async_geoserver_service.py
+from typing import Optional
+
+import httpx
+from Application.interfaces.i_geoserver_service import IGeoServerService
+from Application.services.geoserver_service import GeoServerRest, RestCall
+
+# um AsyncClient por processo: keep-alive e pool de conexões entre as chamadas de
+# todos os publishes (sem um handshake TCP/TLS por requisição)
+_client: Optional[httpx.AsyncClient] = None
+
+
+def _get_client() -> httpx.AsyncClient:
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient()
+    return _client
+
+
+async def close_async_client() -> None:
+    """Fecha o AsyncClient compartilhado (shutdown da API)."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+class AsyncGeoServerService(GeoServerRest, IGeoServerService):
+    """
+    Variante assíncrona (httpx) do GeoServerService, com os mesmos métodos
+    como corrotinas — para rodar o publish no event loop sem travar o worker.
+    URLs, payloads e checagem das respostas vêm do GeoServerRest.
+    """
+
+    # --- helpers ---
+    async def _request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        self.breaker.before_call()
+        timeout = httpx.Timeout(self.timeout, connect=self.connect_timeout)
+        try:
+            r = await _get_client().request(method, url, auth=self.auth, timeout=timeout, **kwargs)
+        except httpx.TransportError as ex:
+            self.breaker.record_failure(ex)
+            raise
+        self._record(r.status_code, method, url)
+        return r
+
+    async def _send(self, call: RestCall) -> httpx.Response:
+        return await self._request(call.method, call.url, content=call.body, headers=call.headers)
+
+    async def _exists(self, url: str) -> bool:
+        r = await self._request("GET", url)
+        return r.status_code == 200
+
+    async def _get_json(self, call: RestCall) -> dict:
+        r = await self._send(call)
+        self._check(r, call)
+        return r.json()
+
+    # ::1
+    async def create_style_registration(self, name: str, workspace: str, filename: str, assume_missing: bool = False) -> None:
+        if not assume_missing:
+            if not await self._exists(self._workspace_url(workspace)):
+                raise self._missing_workspace_error(workspace)
+            if await self._exists(self._style_url(workspace, name, ".xml")):
+                return  # idempotente
+
+        call = self._style_registration_call(name, workspace, filename)
+        self._check(await self._send(call), call)
+
+    # ::2
+    async def upload_style_sld(self, name: str, workspace: str, sld_xml: str) -> None:
+        call = self._upload_sld_call(name, workspace, sld_xml)
+        self._check(await self._send(call), call)
+
+    # ::3
+    async def create_featuretype(self, workspace: str, datastore: str, layer: str, assume_missing: bool = False) -> None:
+        if not assume_missing and await self._exists(self._featuretype_url(workspace, datastore, layer)):
+            return
+        call = self._featuretype_call(workspace, datastore, layer)
+        self._check(await self._send(call), call)
+
+    # ::4
+    async def set_default_style(self, layer: str, workspace: str, style: str) -> None:
+        call = self._default_style_call(layer, workspace, style)
+        self._check(await self._send(call), call)
+
+    # ::5
+    async def get_style_sld_length(self, workspace: str, name: str) -> int | None:
+        r = await self._request("GET", self._style_url(workspace, name, ".sld"))
+        if r.status_code != 200:
+            return None
+        return len(r.text or "")
+
+    # ::6
+    async def check_layer_status(self, layer: str, workspace: str) -> int:
+        r = await self._request("GET", self._layer_url(workspace, layer))
+        return r.status_code
+
+    # --- listagens em lote (reconciliação) ---
+    async def list_featuretypes(self, workspace: str, datastore: str) -> set[str]:
+        return self._names(await self._get_json(self._featuretypes_call(workspace, datastore)), "featureTypes", "featureType")
+
+    async def list_styles(self, workspace: str) -> set[str]:
+        return self._names(await self._get_json(self._styles_call(workspace)), "styles", "style")
+
+    async def list_layers(self, workspace: str) -> set[str]:
+        return self._names(await self._get_json(self._layers_call(workspace)), "layers", "layer")
+
+    async def get_default_style(self, layer: str, workspace: str) -> Optional[str]:
+        call = self._layer_json_call(layer, workspace)
+        r = await self._send(call)
+        if r.status_code == 404:
+            return None
+        self._check(r, call)
+        return self._default_style_name(r.json())
@@ -0,0 +1,136 @@
+# Application/services/export_service.py
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Iterator, Optional
+
+from Data.db_context import get_db_context
+from Data.repositories.shapefile_repository import ShapefileRepository
+from Application.helpers.exceptions import LayerNotFoundError
+from Application.helpers.streaming import file_chunks
+
+# formato -> (media type, extensão)
+EXPORT_FORMATS = {
+    "geojson": ("application/geo+json", "geojson"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "fgb": ("application/flatgeobuf", "fgb"),
+}
+
+
+class ExportService:
+    def __init__(
+        self,
+        repo: ShapefileRepository,
+        schema: str = "zcm",
+        batch_size: int = 5000,
+        temp_root: Optional[str] = None,
+    ):
+        self._repo = repo
+        self._schema = schema
+        self._batch_size = batch_size
+        self._temp_root = temp_root
+
+    @classmethod
+    def create_from_settings(cls, settings) -> "ExportService":
+        db = get_db_context(
+            host=settings.DB_HOST,
+            port=settings.DB_PORT,
+            user=settings.DB_USER,
+            password=settings.DB_PASSWORD,
+            db=settings.DB_NAME,
+        )
+        return cls(
+            repo=ShapefileRepository(db),
+            schema=settings.GEOSERVER_WORKSPACE or "public",
+            batch_size=settings.EXPORT_BATCH_SIZE,
+            temp_root=settings.UPLOAD_TEMP_PATH,
+        )
+
+    # --- helpers ---
+    def _validate(self, layer: str, fields: Optional[list[str]], filters: Optional[dict[str, str]]) -> tuple[int, list[str]]:
+        srid = self._repo.get_layer_srid(table=layer, schema=self._schema)
+        if srid is None:
+            raise LayerNotFoundError(f"Layer '{layer}' não encontrada no schema '{self._schema}'.")
+
+        available = self._repo.list_columns(table=layer, schema=self._schema)
+        requested = list(fields or []) + list((filters or {}).keys())
+        unknown = [c for c in requested if c not in available]
+        if unknown:
+            raise ValueError(f"Atributos inexistentes na layer '{layer}': {', '.join(unknown)}")
+
+        columns = [c for c in available if c in fields] if fields else available
+        return srid, columns
+
+    def _geojson_batches(self, layer, srid, columns, bbox, filters) -> Iterator[list[str]]:
+        return self._repo.stream_geojson_features(
+            table=layer,
+            schema=self._schema,
+            srid=srid,
+            columns=columns,
+            bbox=bbox,
+            filters=filters,
+            batch_size=self._batch_size,
+            # poda de partições só faz diferença com bbox
+            partitioned=bbox is not None and self._repo.is_partitioned(table=layer, schema=self._schema),
+        )
+
+    @staticmethod
+    def _ndjson(batches: Iterator[list[str]]) -> Iterator[bytes]:
+        for batch in batches:
+            yield ("\n".join(batch) + "\n").encode("utf-8")
+
+    @staticmethod
+    def _feature_collection(batches: Iterator[list[str]]) -> Iterator[bytes]:
+        yield b'{"type":"FeatureCollection","features":['
+        first = True
+        for batch in batches:
+            body = ",".join(batch)
+            yield (body if first else "," + body).encode("utf-8")
+            first = False
+        yield b"]}"
+
+    def _flatgeobuf(self, layer, columns, bbox, filters) -> Iterator[bytes]:
+        tmp_root = Path(self._temp_root or tempfile.gettempdir()) / "fauno"
+        tmp_root.mkdir(parents=True, exist_ok=True)
+        tmp_dir = Path(tempfile.mkdtemp(prefix="fauno_export_", dir=tmp_root))
+        dest = tmp_dir / f"{layer}.fgb"
+        try:
+            self._repo.export_with_ogr2ogr(
+                table=layer,
+                schema=self._schema,
+                dest_path=str(dest),
+                driver="FlatGeobuf",
+                columns=columns,
+                bbox=bbox,
+                filters=filters,
+                # sem índice espacial: o GDAL o montaria inteiro em memória
+                layer_options=["SPATIAL_INDEX=NO"],
+            )
+        except Exception:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+        return file_chunks(dest, cleanup_dir=tmp_dir)
+
+    # --- API ---
+    def export_layer(
+        self,
+        layer: str,
+        fmt: str = "geojson",
+        fields: Optional[list[str]] = None,
+        bbox: Optional[tuple[float, float, float, float]] = None,
+        filters: Optional[dict[str, str]] = None,
+    ) -> Iterator[bytes]:
+        """
+        Valida o pedido de imediato (erros viram 4xx antes do streaming começar)
+        e devolve um iterador de bytes no formato pedido.
+        """
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Formato não suportado: {fmt}. Use: {', '.join(EXPORT_FORMATS)}")
+
+        srid, columns = self._validate(layer, fields, filters)
+
+        if fmt == "fgb":
+            return self._flatgeobuf(layer, columns, bbox, filters)
+
+        batches = self._geojson_batches(layer, srid, columns, bbox, filters)
+        return self._ndjson(batches) if fmt == "ndjson" else self._feature_collection(batches)
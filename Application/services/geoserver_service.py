@@ -1,29 +1,201 @@
 # Application/services/geoserver_service.py
+from typing import NamedTuple, Optional, Union
+
 import requests
 from Application.interfaces.i_geoserver_service import IGeoServerService
 from Application.helpers.exceptions import GeoServerError
+from Entities.circuit_breaker import CircuitBreaker, get_breaker
+
+# respostas que indicam GeoServer (ou proxy na frente dele) fora do ar
+_UNAVAILABLE_STATUS = (502, 503, 504)
+
+_XML = {"Content-type": "text/xml", "Accept": "application/xml"}
+_JSON = {"Accept": "application/json"}
+
+
+class RestCall(NamedTuple):
+    """Uma chamada REST já montada: o cliente (sync ou async) só faz o I/O."""
+    method: str
+    url: str
+    body: Union[str, bytes, None] = None
+    headers: Optional[dict] = None
+    ok: tuple[int, ...] = (200,)
+    message: str = ""
+    # criação idempotente: 409 / 500 "already exists" também contam como sucesso
+    tolerate_existing: bool = False
+
 
-class GeoServerService(IGeoServerService):
-    def __init__(self, base_url: str, user: str, password: str):
+class GeoServerRest:
+    """
+    URLs, payloads e checagem das respostas do REST do GeoServer, sem I/O;
+    compartilhado pelo GeoServerService (requests) e pelo AsyncGeoServerService (httpx).
+    """
+
+    def __init__(self, base_url: str, user: str, password: str, breaker: Optional[CircuitBreaker] = None):
         self.base = base_url.rstrip("/")
         self.auth = (user, password)
         self.timeout = 30
+        self.connect_timeout = 5
+        # mesmo breaker nos dois clientes: o estado do GeoServer é um só
+        self.breaker = breaker or get_breaker("geoserver")
+
+    def _record(self, status_code: int, method: str, url: str) -> None:
+        if status_code in _UNAVAILABLE_STATUS:
+            self.breaker.record_failure(Exception(f"HTTP {status_code} em {method} {url}"))
+        else:
+            self.breaker.record_success()
+
+    @staticmethod
+    def _check(r, call: RestCall) -> None:
+        if r.status_code in call.ok:
+            return
+        if call.tolerate_existing and (
+            r.status_code == 409
+            or (r.status_code == 500 and "already exists" in (r.text or "").lower())
+        ):
+            return
+        raise GeoServerError(
+            status_code=r.status_code, method=call.method, url=call.url,
+            response_text=(r.text or "")[:5000],
+            message=call.message
+        )
+
+    # --- URLs ---
+    def _workspace_url(self, workspace: str) -> str:
+        return f"{self.base}/workspaces/{workspace}"
+
+    def _style_url(self, workspace: str, name: str, ext: str = "") -> str:
+        return f"{self.base}/workspaces/{workspace}/styles/{name}{ext}"
+
+    def _featuretype_url(self, workspace: str, datastore: str, layer: str) -> str:
+        return f"{self.base}/workspaces/{workspace}/datastores/{datastore}/featuretypes/{layer}.xml"
+
+    def _layer_url(self, workspace: str, layer: str, ext: str = "") -> str:
+        return f"{self.base}/layers/{workspace}:{layer}{ext}"
+
+    # --- chamadas ---
+    def _ping_call(self) -> RestCall:
+        return RestCall(
+            "GET", f"{self.base}/about/version.json", headers=_JSON,
+            message="GeoServer REST não respondeu como esperado.",
+        )
+
+    def _style_registration_call(self, name: str, workspace: str, filename: str) -> RestCall:
+        return RestCall(
+            "POST", f"{self._workspace_url(workspace)}/styles",
+            body=f"<style><name>{name}</name><filename>{filename}</filename></style>",
+            headers={"Content-type": "text/xml"},
+            ok=(200, 201),
+            message="Falha ao registrar style no GeoServer.",
+            tolerate_existing=True,
+        )
+
+    def _missing_workspace_error(self, workspace: str) -> GeoServerError:
+        return GeoServerError(
+            status_code=404, method="GET",
+            url=self._workspace_url(workspace),
+            response_text="Workspace não encontrado.",
+            message=f"Workspace '{workspace}' não existe no GeoServer."
+        )
+
+    def _upload_sld_call(self, name: str, workspace: str, sld_xml: str) -> RestCall:
+        return RestCall(
+            "PUT", self._style_url(workspace, name),
+            body=sld_xml.encode("utf-8"),
+            headers={"Content-type": "application/vnd.ogc.se+xml", "Accept": "application/xml"},
+            ok=(200, 201),
+            message="Falha ao enviar SLD para o GeoServer.",
+        )
+
+    def _featuretype_call(self, workspace: str, datastore: str, layer: str) -> RestCall:
+        return RestCall(
+            "POST", f"{self._workspace_url(workspace)}/datastores/{datastore}/featuretypes",
+            body=f"<featureType><name>{layer}</name></featureType>",
+            headers=_XML,
+            ok=(200, 201),
+            message="Falha ao criar featureType no GeoServer.",
+            tolerate_existing=True,
+        )
+
+    def _default_style_call(self, layer: str, workspace: str, style: str) -> RestCall:
+        payload = f"""<layer>
+    <defaultStyle>
+        <name>{style}</name>
+        <workspace>{workspace}</workspace>
+    </defaultStyle>
+    </layer>"""
+        return RestCall(
+            "PUT", self._layer_url(workspace, layer), body=payload, headers=_XML,
+            ok=(200, 201),
+            message="Falha ao vincular defaultStyle no GeoServer.",
+        )
+
+    def _list_call(self, url: str, what: str) -> RestCall:
+        return RestCall("GET", url, headers=_JSON, message=f"Falha ao listar {what} no GeoServer.")
+
+    def _featuretypes_call(self, workspace: str, datastore: str) -> RestCall:
+        return self._list_call(
+            f"{self._workspace_url(workspace)}/datastores/{datastore}/featuretypes.json", "featureTypes"
+        )
+
+    def _styles_call(self, workspace: str) -> RestCall:
+        return self._list_call(f"{self._workspace_url(workspace)}/styles.json", "styles")
+
+    def _layers_call(self, workspace: str) -> RestCall:
+        return self._list_call(f"{self._workspace_url(workspace)}/layers.json", "layers")
+
+    def _layer_json_call(self, layer: str, workspace: str) -> RestCall:
+        return RestCall(
+            "GET", self._layer_url(workspace, layer, ".json"), headers=_JSON,
+            message="Falha ao consultar layer no GeoServer.",
+        )
 
+    # --- respostas ---
+    @staticmethod
+    def _names(payload: dict, collection: str, item: str) -> set[str]:
+        # coleção vazia vem como string vazia ("featureTypes": "")
+        container = payload.get(collection) or {}
+        items = container.get(item, []) if isinstance(container, dict) else []
+        if isinstance(items, dict):
+            items = [items]
+        # algumas versões devolvem o nome qualificado (workspace:nome)
+        return {i["name"].split(":")[-1] for i in items if isinstance(i, dict) and "name" in i}
+
+    @staticmethod
+    def _default_style_name(payload: dict) -> Optional[str]:
+        style = (payload.get("layer") or {}).get("defaultStyle") or {}
+        name = style.get("name") if isinstance(style, dict) else None
+        # algumas versões devolvem o nome qualificado (workspace:nome)
+        return name.split(":")[-1] if name else None
+
+
+class GeoServerService(GeoServerRest, IGeoServerService):
     # --- helpers ---
-    def _workspace_exists(self, workspace: str) -> bool:
-        url = f"{self.base}/workspaces/{workspace}"
-        r = requests.get(url, auth=self.auth, timeout=self.timeout)
-        return r.status_code == 200
+    def _http(self, method: str, url: str, **kwargs) -> requests.Response:
+        # toda chamada REST passa pelo circuit breaker: GeoServer caído falha na hora
+        self.breaker.before_call()
+        try:
+            r = requests.request(method, url, auth=self.auth, timeout=(self.connect_timeout, self.timeout), **kwargs)
+        except (requests.ConnectionError, requests.Timeout) as ex:
+            self.breaker.record_failure(ex)
+            raise
+        self._record(r.status_code, method, url)
+        return r
 
-    def _style_exists(self, workspace: str, name: str) -> bool:
-        url = f"{self.base}/workspaces/{workspace}/styles/{name}.xml"
-        r = requests.get(url, auth=self.auth, timeout=self.timeout)
-        return r.status_code == 200
+    def _send(self, call: RestCall) -> requests.Response:
+        return self._http(call.method, call.url, data=call.body, headers=call.headers)
 
-    def _featuretype_exists(self, workspace: str, datastore: str, layer: str) -> bool:
-        url = f"{self.base}/workspaces/{workspace}/datastores/{datastore}/featuretypes/{layer}.xml"
-        r = requests.get(url, auth=self.auth, timeout=self.timeout)
-        return r.status_code == 200
+    def _exists(self, url: str) -> bool:
+        return self._http("GET", url).status_code == 200
+
+    def _get_json(self, call: RestCall) -> dict:
+        r = self._send(call)
+        self._check(r, call)
+        return r.json()
+
+    def ping(self) -> None:
+        """Sonda leve do REST (health check); erro de rede/HTTP propaga."""
+        self._get_json(self._ping_call())
 
     @staticmethod
     def dump_response(r, max_bytes=200000):
@@ -71,113 +243,61 @@ class GeoServerService(IGeoServerService):
         # 201 (created) é o ideal; 401/403/500 podem surgir em setups — trate 409 (já existe)
         if r.status_code not in (200, 201, 409):
             r.raise_for_status()
-        
-    # ::1   
-    def create_style_registration(self, name: str, workspace: str, filename: str) -> None:
-        if not self._workspace_exists(workspace):
-            raise GeoServerError(
-                status_code=404, method="GET",
-                url=f"{self.base}/workspaces/{workspace}",
-                response_text="Workspace não encontrado.",
-                message=f"Workspace '{workspace}' não existe no GeoServer."
-            )
-        if self._style_exists(workspace, name):
-            return  # idempotente
 
-        url = f"{self.base}/workspaces/{workspace}/styles"
-        data = f"<style><name>{name}</name><filename>{filename}</filename></style>"
-        r = requests.post(
-            url, data=data,
-            headers={"Content-type": "text/xml"},
-            auth=self.auth, timeout=self.timeout
-        )
-        
-        if r.status_code in (200, 201, 409):
-            return
-        if r.status_code == 500 and "already exists" in (r.text or "").lower():
-            return
+    # ::1
+    def create_style_registration(self, name: str, workspace: str, filename: str, assume_missing: bool = False) -> None:
+        # assume_missing: o chamador já sabe (ex.: listagem em lote) que o workspace existe e o style não
+        if not assume_missing:
+            if not self._exists(self._workspace_url(workspace)):
+                raise self._missing_workspace_error(workspace)
+            if self._exists(self._style_url(workspace, name, ".xml")):
+                return  # idempotente
 
-        body_preview = info["body_text"] or (str(info["body_json"]) if info["body_json"] else None)
-        raise GeoServerError(
-            status_code=r.status_code,
-            method="POST",
-            url=url,
-            response_text=(body_preview or "")[:5000],
-            message="Falha ao registrar style no GeoServer."
-        )
+        call = self._style_registration_call(name, workspace, filename)
+        self._check(self._send(call), call)
 
     # ::2
     def upload_style_sld(self, name: str, workspace: str, sld_xml: str) -> None:
-        url = f"{self.base}/workspaces/{workspace}/styles/{name}"
-        r = requests.put(
-            url,
-            data=sld_xml.encode("utf-8"),
-            headers={"Content-type": "application/vnd.ogc.se+xml", "Accept": "application/xml"},
-            auth=self.auth, timeout=self.timeout
-        )
-        if r.status_code in (200, 201):
-            return
-        # antes: r.raise_for_status()
-        raise GeoServerError(
-            status_code=r.status_code, method="PUT", url=url,
-            response_text=r.text,
-            message="Falha ao enviar SLD para o GeoServer."
-        )
+        call = self._upload_sld_call(name, workspace, sld_xml)
+        self._check(self._send(call), call)
 
     # ::3
-    def create_featuretype(self, workspace: str, datastore: str, layer: str) -> None:
-        if self._featuretype_exists(workspace, datastore, layer):
+    def create_featuretype(self, workspace: str, datastore: str, layer: str, assume_missing: bool = False) -> None:
+        if not assume_missing and self._exists(self._featuretype_url(workspace, datastore, layer)):
             return
-
-        url = f"{self.base}/workspaces/{workspace}/datastores/{datastore}/featuretypes"
-        payload = f"<featureType><name>{layer}</name></featureType>"
-        r = requests.post(
-            url, data=payload,
-            headers={"Content-type": "text/xml", "Accept": "application/xml"},
-            auth=self.auth, timeout=self.timeout
-        )
-        if r.status_code in (200, 201, 409):
-            return
-        if r.status_code == 500 and "already exists" in (r.text or "").lower():
-            return
-        raise GeoServerError(
-            status_code=r.status_code, method="POST", url=url,
-            response_text=r.text,
-            message="Falha ao criar featureType no GeoServer."
-        )
+        call = self._featuretype_call(workspace, datastore, layer)
+        self._check(self._send(call), call)
 
     # ::4
     def set_default_style(self, layer: str, workspace: str, style: str) -> None:
-        url = f"{self.base}/layers/{workspace}:{layer}"
-        payload = f"""<layer>
-    <defaultStyle>
-        <name>{style}</name>
-        <workspace>{workspace}</workspace>
-    </defaultStyle>
-    </layer>"""
-        r = requests.put(
-            url, data=payload,
-            headers={"Content-type": "text/xml", "Accept": "application/xml"},
-            auth=self.auth, timeout=self.timeout
-        )
-        if r.status_code in (200, 201):
-            return
-        raise GeoServerError(
-            status_code=r.status_code, method="PUT", url=url,
-            response_text=r.text,
-            message="Falha ao vincular defaultStyle no GeoServer."
-        )
+        call = self._default_style_call(layer, workspace, style)
+        self._check(self._send(call), call)
 
     # ::5
     def get_style_sld_length(self, workspace: str, name: str) -> int | None:
-        url = f"{self.base}/workspaces/{workspace}/styles/{name}.sld"
-        r = requests.get(url, auth=self.auth, timeout=self.timeout)
+        r = self._http("GET", self._style_url(workspace, name, ".sld"))
         if r.status_code != 200:
             return None
         return len(r.text or "")
 
     # ::6
     def check_layer_status(self, layer: str, workspace: str) -> int:
-        url = f"{self.base}/layers/{workspace}:{layer}"
-        r = requests.get(url, auth=self.auth, timeout=self.timeout)
-        return r.status_code
\ No newline at end of file
+        return self._http("GET", self._layer_url(workspace, layer)).status_code
+
+    # --- listagens em lote (reconciliação) ---
+    def list_featuretypes(self, workspace: str, datastore: str) -> set[str]:
+        return self._names(self._get_json(self._featuretypes_call(workspace, datastore)), "featureTypes", "featureType")
+
+    def list_styles(self, workspace: str) -> set[str]:
+        return self._names(self._get_json(self._styles_call(workspace)), "styles", "style")
+
+    def list_layers(self, workspace: str) -> set[str]:
+        return self._names(self._get_json(self._layers_call(workspace)), "layers", "layer")
+
+    def get_default_style(self, layer: str, workspace: str) -> Optional[str]:
+        call = self._layer_json_call(layer, workspace)
+        r = self._send(call)
+        if r.status_code == 404:
+            return None
+        self._check(r, call)
+        return self._default_style_name(r.json())
@@ -0,0 +1,93 @@
+# Application/services/health_service.py
+import asyncio
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, Optional
+
+from Data.db_context import DbContext, get_db_context
+from Entities.circuit_breaker import all_breakers
+from Application.services.geoserver_service import GeoServerService
+
+
+def _probe(fn: Callable[[], None]) -> dict:
+    started = time.perf_counter()
+    try:
+        fn()
+        ok, error = True, None
+    except Exception as ex:
+        ok, error = False, str(ex)[:500]
+    return {
+        "ok": ok,
+        "latency_ms": round((time.perf_counter() - started) * 1000, 1),
+        "error": error,
+        "checked_at": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+class HealthMonitor:
+    """
+    Health check profundo com resultado em cache: as sondas rodam em segundo
+    plano a cada `refresh_seconds` e o /health/deep só lê o último resultado.
+    """
+
+    def __init__(self, db: DbContext, geoserver: GeoServerService, refresh_seconds: float = 15.0):
+        self._db = db
+        self._gs = geoserver
+        self._refresh_seconds = refresh_seconds
+        self._last: Optional[dict] = None
+        self._last_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def refresh_seconds(self) -> float:
+        return self._refresh_seconds
+
+    def refresh(self) -> dict:
+        postgis = _probe(self._db.ping)
+        postgis["pool"] = self._db.pool_status()
+        result = {"postgis": postgis, "geoserver": _probe(self._gs.ping)}
+        with self._lock:
+            self._last, self._last_at = result, time.monotonic()
+        return result
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            last, age = self._last, time.monotonic() - self._last_at
+        # sem refresher rodando (ou travado), atualiza sob demanda
+        if last is None or age > 2 * self._refresh_seconds:
+            last, age = self.refresh(), 0.0
+        return {
+            "status": "ok" if all(v["ok"] for v in last.values()) else "degraded",
+            "age_seconds": round(age, 1),
+            "checks": last,
+            "breakers": all_breakers(),
+        }
+
+    async def run_forever(self) -> None:
+        """Laço de atualização para rodar como task no startup da API."""
+        while True:
+            await asyncio.to_thread(self.refresh)
+            await asyncio.sleep(self._refresh_seconds)
+
+
+_monitor: Optional[HealthMonitor] = None
+
+
+def get_health_monitor(settings) -> HealthMonitor:
+    global _monitor
+    if _monitor is None:
+        db = get_db_context(
+            host=settings.DB_HOST,
+            port=settings.DB_PORT,
+            user=settings.DB_USER,
+            password=settings.DB_PASSWORD,
+            db=settings.DB_NAME,
+        )
+        gs = GeoServerService(
+            base_url=settings.GEOSERVER_BASEURL,
+            user=settings.GEOSERVER_USER,
+            password=settings.GEOSERVER_PASSWORD,
+        )
+        _monitor = HealthMonitor(db=db, geoserver=gs, refresh_seconds=settings.HEALTH_REFRESH_SECONDS)
+    return _monitor
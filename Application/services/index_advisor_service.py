@@ -0,0 +1,160 @@
+# Application/services/index_advisor_service.py
+import asyncio
+import logging
+import time
+from typing import Optional
+
+from Data.db_context import get_db_context
+from Data.repositories.shapefile_repository import ShapefileRepository
+from Entities.index_advisor_helper import choose_index_method, predicate_columns
+
+_log = logging.getLogger("fauno.indexes")
+
+
+class IndexAdvisorService:
+    """
+    Sugere índices de atributo para as tabelas do schema a partir do
+    pg_stat_statements (colunas filtradas/ordenadas pelo GeoServer) e do
+    pg_stat_user_tables (tabelas grandes com seq scan). Com `auto_create`,
+    cria os índices com CREATE INDEX CONCURRENTLY.
+    """
+
+    def __init__(
+        self,
+        repo: ShapefileRepository,
+        schema: str = "zcm",
+        auto_create: bool = False,
+        min_calls: int = 50,
+        min_rows: int = 100000,
+        brin_min_rows: int = 1000000,
+    ):
+        self._repo = repo
+        self._schema = schema
+        self._auto_create = auto_create
+        self._min_calls = min_calls
+        self._min_rows = min_rows
+        self._brin_min_rows = brin_min_rows
+
+    @classmethod
+    def create_from_settings(cls, settings) -> "IndexAdvisorService":
+        db = get_db_context(
+            host=settings.DB_HOST,
+            port=settings.DB_PORT,
+            user=settings.DB_USER,
+            password=settings.DB_PASSWORD,
+            db=settings.DB_NAME,
+        )
+        return cls(
+            repo=ShapefileRepository(db),
+            schema=settings.GEOSERVER_WORKSPACE or "public",
+            auto_create=settings.INDEX_ADVISOR_AUTO_CREATE,
+            min_calls=settings.INDEX_ADVISOR_MIN_CALLS,
+            min_rows=settings.INDEX_ADVISOR_MIN_ROWS,
+            brin_min_rows=settings.INDEX_ADVISOR_BRIN_MIN_ROWS,
+        )
+
+    @property
+    def auto_create(self) -> bool:
+        return self._auto_create
+
+    # --- helpers ---
+    def _advise_table(self, usage: dict, statements: list[dict]) -> list[dict]:
+        table = usage["table"]
+        columns = self._repo.column_stats(table, schema=self._schema)
+        indexed = {i["column"] for i in self._repo.list_indexes(table, schema=self._schema)}
+
+        calls: dict[str, dict[str, int]] = {}
+        for stmt in statements:
+            for col, kinds in predicate_columns(stmt["query"], self._schema, table, columns.keys()).items():
+                per_kind = calls.setdefault(col, {"filter": 0, "sort": 0})
+                for kind in kinds:
+                    per_kind[kind] += int(stmt["calls"])
+
+        recommendations = []
+        for col, per_kind in calls.items():
+            total = per_kind["filter"] + per_kind["sort"]
+            # fid já tem a PK; coluna já liderando algum índice não precisa de outro
+            if col == "fid" or col in indexed or total < self._min_calls:
+                continue
+            info = columns[col]
+            method = choose_index_method(
+                info["data_type"], info["correlation"], usage["n_live_tup"], self._brin_min_rows
+            )
+            recommendations.append({
+                "table": table,
+                "column": col,
+                "method": method,
+                "index_name": self._repo.attribute_index_name(table, col, method),
+                "filter_calls": per_kind["filter"],
+                "sort_calls": per_kind["sort"],
+                "correlation": info["correlation"],
+                "n_live_tup": usage["n_live_tup"],
+                "seq_scan": usage["seq_scan"],
+                "seq_tup_read": usage["seq_tup_read"],
+            })
+        return recommendations
+
+    # --- API ---
+    def advise(self, table: Optional[str] = None) -> dict:
+        started = time.perf_counter()
+        statements = self._repo.statement_stats(self._schema)
+        hot_tables = [
+            u for u in self._repo.table_usage_stats(self._schema)
+            if (table is None or u["table"] == table)
+            and u["n_live_tup"] >= self._min_rows
+            and u["seq_scan"] > 0
+        ]
+
+        recommendations = []
+        if statements:
+            for usage in hot_tables:
+                recommendations += self._advise_table(usage, statements)
+        recommendations.sort(key=lambda r: r["filter_calls"] + r["sort_calls"], reverse=True)
+
+        return {
+            "schema": self._schema,
+            # sem pg_stat_statements só dá para apontar as tabelas com seq scan
+            "pg_stat_statements": statements is not None,
+            "auto_create": self._auto_create,
+            "hot_tables": hot_tables,
+            "recommendations": recommendations,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+        }
+
+    def apply(self, recommendations: list[dict]) -> list[dict]:
+        """Cria os índices um a um (CONCURRENTLY não roda em paralelo na mesma tabela)."""
+        results = []
+        for rec in recommendations:
+            started = time.perf_counter()
+            try:
+                name = self._repo.create_attribute_index(
+                    rec["table"], rec["column"], rec["method"], schema=self._schema, concurrently=True,
+                )
+                results.append({**rec, "index_name": name, "created": True, "error": None})
+            except Exception as ex:
+                _log.warning("falha ao criar índice em %s.%s: %s", rec["table"], rec["column"], ex)
+                results.append({**rec, "created": False, "error": str(ex)[:500]})
+            results[-1]["seconds"] = round(time.perf_counter() - started, 3)
+        return results
+
+    def run(self, table: Optional[str] = None, apply: Optional[bool] = None) -> dict:
+        """advise + (opcionalmente) apply; `apply=None` segue o auto_create."""
+        report = self.advise(table=table)
+        should_apply = self._auto_create if apply is None else apply
+        if should_apply:
+            report["applied"] = self.apply(report["recommendations"])
+        return report
+
+
+async def run_advisor_forever(settings) -> None:
+    """Laço do modo automático (IndexAdvisor.AutoCreate) para rodar como task no startup da API."""
+    service = IndexAdvisorService.create_from_settings(settings)
+    while True:
+        try:
+            report = await asyncio.to_thread(service.run)
+            created = [a["index_name"] for a in report.get("applied", []) if a["created"]]
+            if created:
+                _log.info("índices criados pelo advisor: %s", ", ".join(created))
+        except Exception:
+            _log.exception("index advisor falhou")
+        await asyncio.sleep(settings.INDEX_ADVISOR_INTERVAL_SECONDS)
@@ -0,0 +1,94 @@
+# Application/services/inspect_service.py
+import hashlib
+import time
+from pathlib import Path
+from typing import BinaryIO, Optional
+
+from Entities.shapefile_inspector import inspect_shapefile_zip
+from Application.helpers.lru_cache import LruCache
+
+_CHUNK = 1024 * 1024
+
+# por processo: o upload seguinte reaproveita a inspeção feita no /inspect
+_cache: Optional[LruCache] = None
+
+
+def _get_cache(max_items: int) -> LruCache:
+    global _cache
+    if _cache is None:
+        _cache = LruCache(max_items=max_items)
+    return _cache
+
+
+def sha256_of(f: BinaryIO) -> str:
+    h = hashlib.sha256()
+    f.seek(0)
+    for chunk in iter(lambda: f.read(_CHUNK), b""):
+        h.update(chunk)
+    f.seek(0)
+    return h.hexdigest()
+
+
+def save_and_sha256(f: BinaryIO, dest: Path) -> str:
+    """Grava o upload em disco e calcula o SHA-256 na mesma passada (rodar fora do event loop)."""
+    h = hashlib.sha256()
+    f.seek(0)
+    with open(dest, "wb") as out:
+        for chunk in iter(lambda: f.read(_CHUNK), b""):
+            h.update(chunk)
+            out.write(chunk)
+    f.seek(0)
+    return h.hexdigest()
+
+
+class InspectService:
+    def __init__(self, cache: LruCache, features_per_second: float = 20000.0, max_fields: int = 100):
+        self._cache = cache
+        self._features_per_second = features_per_second
+        self._max_fields = max_fields
+
+    @classmethod
+    def create_from_settings(cls, settings) -> "InspectService":
+        return cls(
+            cache=_get_cache(settings.INSPECT_CACHE_MAX_ITEMS),
+            features_per_second=settings.INSPECT_FEATURES_PER_SECOND,
+            max_fields=settings.INSPECT_MAX_FIELDS,
+        )
+
+    def get_cached(self, archive_sha256: str) -> Optional[dict]:
+        return self._cache.get(archive_sha256)
+
+    def inspect(self, archive: BinaryIO, archive_sha256: Optional[str] = None, expected_srid: Optional[int] = None) -> dict:
+        """
+        Inspeciona o ZIP (arquivo seekable) e guarda o resultado pelo hash do arquivo.
+        """
+        started = time.perf_counter()
+        digest = archive_sha256 or sha256_of(archive)
+
+        result = self._cache.get(digest)
+        cached = result is not None
+        if not cached:
+            archive.seek(0)
+            result = inspect_shapefile_zip(
+                archive,
+                features_per_second=self._features_per_second,
+                max_fields=self._max_fields,
+            )
+            result["archive_sha256"] = digest
+            self._cache.put(digest, result)
+
+        # aviso depende do SRID pedido, então não vai para o cache
+        warnings = list(result["warnings"])
+        if expected_srid:
+            for layer in result["layers"]:
+                if layer["epsg"] and layer["epsg"] != expected_srid:
+                    warnings.append(
+                        f"{layer['name']}: .prj em EPSG:{layer['epsg']}, diferente do SRID informado ({expected_srid})."
+                    )
+
+        return {
+            **result,
+            "warnings": warnings,
+            "cached": cached,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+        }
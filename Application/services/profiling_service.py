@@ -0,0 +1,54 @@
+# Application/services/profiling_service.py
+import random
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+from Application.helpers.profiler import ProfileStore, get_profile_store
+
+
+class ProfilingService:
+    """
+    Liga o profiling (cProfile + tracemalloc) do upload sob demanda de um admin
+    ou por amostragem. Com `enabled=False` nada é instrumentado.
+    """
+
+    def __init__(self, store: ProfileStore, enabled: bool = False, sample_rate: float = 0.0):
+        self._store = store
+        self._enabled = enabled
+        self._sample_rate = max(0.0, min(1.0, sample_rate))
+
+    @classmethod
+    def create_from_settings(cls, settings) -> "ProfilingService":
+        root = settings.PROFILING_PATH or str(
+            Path(settings.UPLOAD_TEMP_PATH or tempfile.gettempdir()) / "fauno_profiles"
+        )
+        store = get_profile_store(
+            root=root,
+            retention=settings.PROFILING_RETENTION,
+            top_allocations=settings.PROFILING_TOP_ALLOCATIONS,
+        )
+        return cls(store=store, enabled=settings.PROFILING_ENABLED, sample_rate=settings.PROFILING_SAMPLE_RATE)
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+
+    def trigger_for(self, requested: bool) -> Optional[str]:
+        """'request' (pedido explícito), 'sample' (amostragem) ou None (não perfilar)."""
+        if not self._enabled:
+            return None
+        if requested:
+            return "request"
+        if self._sample_rate and random.random() < self._sample_rate:
+            return "sample"
+        return None
+
+    def session(self, label: str, trigger: str):
+        return self._store.session(label, trigger)
+
+    def list_profiles(self) -> list[dict]:
+        return self._store.list()
+
+    def resolve_file(self, profile_id: str, filename: str) -> Optional[Path]:
+        return self._store.resolve_file(profile_id, filename)
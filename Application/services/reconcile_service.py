@@ -0,0 +1,151 @@
+# Application/services/reconcile_service.py
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from Data.db_context import get_db_context
+from Data.repositories.shapefile_repository import ShapefileRepository
+from Entities.geoserver_helper import build_basic_polygon_sld
+from Application.services.geoserver_service import GeoServerService
+from Application.helpers.exceptions import CircuitOpenError
+
+
+class ReconcileService:
+    """
+    Sincroniza o schema inteiro com o GeoServer em uma passada:
+    poucas listagens em lote, diff local e criação só do que falta.
+    """
+
+    def __init__(self, repo: ShapefileRepository, geoserver: GeoServerService, schema: str = "zcm", max_workers: int = 4):
+        self._repo = repo
+        self._gs = geoserver
+        self._schema = schema
+        self._max_workers = max(1, max_workers)
+
+    @classmethod
+    def create_from_settings(cls, settings) -> "ReconcileService":
+        db = get_db_context(
+            host=settings.DB_HOST,
+            port=settings.DB_PORT,
+            user=settings.DB_USER,
+            password=settings.DB_PASSWORD,
+            db=settings.DB_NAME,
+        )
+        gs = GeoServerService(
+            base_url=settings.GEOSERVER_BASEURL,
+            user=settings.GEOSERVER_USER,
+            password=settings.GEOSERVER_PASSWORD,
+        )
+        return cls(
+            repo=ShapefileRepository(db),
+            geoserver=gs,
+            schema=settings.GEOSERVER_WORKSPACE or "public",
+            max_workers=settings.RECONCILE_MAX_WORKERS,
+        )
+
+    # --- helpers ---
+    @staticmethod
+    def _plan_layer(table: str, featuretypes: set[str], styles: set[str], layers: set[str]) -> list[str]:
+        actions = []
+        if f"{table}_style" not in styles:
+            actions += ["create_style", "upload_sld"]
+        if table not in featuretypes:
+            actions.append("create_featuretype")
+        # layer recriada: precisa (re)vincular o defaultStyle
+        if actions or table not in layers:
+            actions.append("set_default_style")
+        return actions
+
+    def _check_default_style(self, table: str, workspace: str) -> tuple[list[str], Optional[str]]:
+        # layer que já existe com tudo no lugar: só falta conferir se o defaultStyle é o esperado.
+        # Falha na consulta não vira ação (o dry-run reportaria um drift que não viu):
+        # a layer sai como check_failed; breaker aberto derruba a reconciliação inteira
+        try:
+            current = self._gs.get_default_style(table, workspace)
+        except CircuitOpenError:
+            raise
+        except Exception as ex:
+            return [], str(ex)[:500]
+        return ([] if current == f"{table}_style" else ["set_default_style"]), None
+
+    def _apply_layer(self, table: str, actions: list[str], workspace: str, datastore: str) -> dict:
+        style_name = f"{table}_style"
+        started = time.perf_counter()
+        try:
+            if "create_style" in actions:
+                self._gs.create_style_registration(style_name, workspace, f"{table}.sld", assume_missing=True)
+            if "upload_sld" in actions:
+                self._gs.upload_style_sld(style_name, workspace, build_basic_polygon_sld(table))
+            if "create_featuretype" in actions:
+                self._gs.create_featuretype(workspace, datastore, table, assume_missing=True)
+            if "set_default_style" in actions:
+                self._gs.set_default_style(table, workspace, style_name)
+            error = None
+        except Exception as ex:
+            error = str(ex)
+        return {
+            "layer": table,
+            "actions": actions,
+            "ok": error is None,
+            "error": error,
+            "seconds": round(time.perf_counter() - started, 3),
+        }
+
+    # --- API ---
+    def reconcile(self, workspace: str, datastore: str, dry_run: bool = True, max_workers: Optional[int] = None) -> dict:
+        timings: dict[str, float] = {}
+        t0 = time.perf_counter()
+
+        tables = [r["f_table_name"] for r in self._repo.list_layers(self._schema)]
+        timings["list_tables"] = round(time.perf_counter() - t0, 3)
+
+        t1 = time.perf_counter()
+        featuretypes = self._gs.list_featuretypes(workspace, datastore)
+        styles = self._gs.list_styles(workspace)
+        layers = self._gs.list_layers(workspace)
+        plan = {t: self._plan_layer(t, featuretypes, styles, layers) for t in tables}
+
+        # um GET por layer já publicada para comparar o defaultStyle
+        to_check = [t for t, a in plan.items() if not a]
+        check_failed: dict[str, str] = {}
+        workers = max(1, max_workers or self._max_workers)
+        if to_check:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                checks = pool.map(lambda t: self._check_default_style(t, workspace), to_check)
+                for t, (actions, error) in zip(to_check, checks):
+                    plan[t] = actions
+                    if error is not None:
+                        check_failed[t] = error
+        timings["fetch_geoserver"] = round(time.perf_counter() - t1, 3)
+
+        pending = {t: a for t, a in plan.items() if a}
+
+        t2 = time.perf_counter()
+        if dry_run:
+            results = [{"layer": t, "actions": a, "ok": None, "error": None, "seconds": 0.0} for t, a in pending.items()]
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(lambda item: self._apply_layer(item[0], item[1], workspace, datastore), pending.items()))
+        timings["apply"] = round(time.perf_counter() - t2, 3)
+        timings["total"] = round(time.perf_counter() - t0, 3)
+
+        return {
+            "workspace": workspace,
+            "datastore": datastore,
+            "dry_run": dry_run,
+            "summary": {
+                "tables": len(tables),
+                "in_sync": len(tables) - len(pending) - len(check_failed),
+                "pending": len(pending),
+                "check_failed": len(check_failed),
+                "applied": sum(1 for r in results if r["ok"]),
+                "failed": sum(1 for r in results if r["ok"] is False),
+                "rest_calls": 3 + len(to_check) + sum(len(r["actions"]) for r in results if not dry_run),
+            },
+            "timings": timings,
+            "layers": results,
+            # defaultStyle não pôde ser conferido: nada foi planejado nem aplicado nessas layers
+            "check_failed": [{"layer": t, "error": e} for t, e in check_failed.items()],
+            # publicadas no GeoServer sem tabela correspondente — só reportadas, nunca removidas
+            "orphans": sorted(featuretypes - set(tables)),
+        }
@@ -1,20 +1,54 @@
+import asyncio
+import os
 from typing import Optional
 
-from Data.db_context import DbContext
+from Data.db_context import get_db_context
+from Data.db_executor import run_db
 from Data.repositories.shapefile_repository import ShapefileRepository
 from Entities.shapefile_entity import ShapefileEntity
 from Entities.geoserver_helper import build_basic_polygon_sld
+from Entities.crs_helper import detect_prj_epsg
+from Entities.shapefile_inspector import shapefile_feature_count
 from Application.services.geoserver_service import GeoServerService
+from Application.services.async_geoserver_service import AsyncGeoServerService
+from Application.helpers.tile_cache import TileCache
+from Application.helpers.profiler import profiled
+from Application.helpers.exceptions import LayerNotFoundError
+from Application.services.tile_service import tile_cache_from_settings
 
 class ShapefileService:
-    def __init__(self, repo: ShapefileRepository, geoserver: GeoServerService, schema: str = "zcm"):
+    def __init__(
+        self,
+        repo: ShapefileRepository,
+        geoserver: GeoServerService,
+        schema: str = "zcm",
+        tile_cache: Optional[TileCache] = None,
+        reproject_seconds_per_mb: float = 0.05,
+        import_parallelism: int = 1,
+        parallel_min_features: int = 500000,
+        async_geoserver: Optional[AsyncGeoServerService] = None,
+        partition_min_features: Optional[int] = None,
+        partition_grid_size: float = 0.5,
+        partition_column: Optional[str] = None,
+        partition_max_partitions: int = 256,
+    ):
         self._repo = repo
         self._gs = geoserver
         self._schema = schema
+        self._tile_cache = tile_cache
+        self._reproject_seconds_per_mb = reproject_seconds_per_mb
+        self._import_parallelism = import_parallelism
+        self._parallel_min_features = parallel_min_features
+        self._gs_async = async_geoserver
+        # None = armazenamento particionado desligado
+        self._partition_min_features = partition_min_features
+        self._partition_grid_size = partition_grid_size
+        self._partition_column = partition_column
+        self._partition_max_partitions = partition_max_partitions
 
     @classmethod
     def create_from_settings(cls, settings) -> "ShapefileService":
-        db = DbContext(
+        db = get_db_context(
             host=settings.DB_HOST,
             port=settings.DB_PORT,
             user=settings.DB_USER,
@@ -27,15 +61,141 @@ class ShapefileService:
             user=settings.GEOSERVER_USER,
             password=settings.GEOSERVER_PASSWORD,
         )
+        gs_async = AsyncGeoServerService(
+            base_url=settings.GEOSERVER_BASEURL,
+            user=settings.GEOSERVER_USER,
+            password=settings.GEOSERVER_PASSWORD,
+        )
         # schema padrão = workspace (mantém simetria)
         schema = settings.GEOSERVER_WORKSPACE or "public"
-        return cls(repo=repo, geoserver=gs, schema=schema)
+        return cls(
+            repo=repo,
+            geoserver=gs,
+            async_geoserver=gs_async,
+            schema=schema,
+            tile_cache=tile_cache_from_settings(settings),
+            reproject_seconds_per_mb=settings.IMPORT_REPROJECT_SECONDS_PER_MB,
+            import_parallelism=settings.IMPORT_PARALLELISM,
+            parallel_min_features=settings.IMPORT_PARALLEL_MIN_FEATURES,
+            partition_min_features=settings.PARTITION_MIN_FEATURES if settings.PARTITION_ENABLED else None,
+            partition_grid_size=settings.PARTITION_GRID_SIZE,
+            partition_column=settings.PARTITION_COLUMN,
+            partition_max_partitions=settings.PARTITION_MAX_PARTITIONS,
+        )
+
+    def ensure_targets_available(self) -> None:
+        """
+        Pré-checagem barata antes do import: se o PostGIS ou o GeoServer estão
+        com o circuit breaker aberto, rejeita já (CircuitOpenError) em vez de
+        importar tudo e só falhar no publish.
+        """
+        self._repo.ensure_available()
+        self._gs.breaker.ensure_available()
+
+    def _parallel_plan(self, shp: ShapefileEntity, parallelism: Optional[int]) -> tuple[int, Optional[int]]:
+        # SRID de origem pelo .prj: se já bate com o destino, o ogr2ogr não reprojeta
+        if shp.source_srid is None:
+            shp.source_srid = detect_prj_epsg(shp.path)
+
+        # shapefiles grandes: carga particionada por faixas de FID em N conexões
+        degree = parallelism or self._import_parallelism
+        feature_count = shapefile_feature_count(shp.path)
+        if degree > 1 and feature_count is not None and feature_count >= self._parallel_min_features:
+            return degree, feature_count
+        return 1, feature_count
+
+    def _advised_indexes(self, shp: ShapefileEntity) -> list[dict]:
+        # índices do index advisor na versão atual da tabela (somem com o drop)
+        return [i for i in self._repo.list_indexes(shp.name, schema=self._schema) if i["advised"]]
+
+    def _reapply_indexes(self, shp: ShapefileEntity, advised: list[dict]) -> list[dict]:
+        # sem CONCURRENTLY: a tabela recém-importada ainda não tem leitores
+        columns = set(self._repo.list_columns(shp.name, schema=self._schema))
+        results = []
+        for idx in advised:
+            if idx["column"] not in columns:
+                continue  # coluna sumiu no shapefile novo
+            try:
+                name = self._repo.create_attribute_index(
+                    shp.name, idx["column"], idx["method"], schema=self._schema, concurrently=False
+                )
+                results.append({"index_name": name, "created": True, "error": None})
+            except Exception as ex:
+                # índice é otimização: não derruba o import já concluído
+                results.append({"index_name": idx["index_name"], "created": False, "error": str(ex)[:500]})
+        return results
+
+    def _partition_if_large(self, shp: ShapefileEntity, feature_count: Optional[int]) -> Optional[dict]:
+        # opt-in: só layers acima do limite viram tabela particionada
+        if self._partition_min_features is None or feature_count is None:
+            return None
+        if feature_count < self._partition_min_features:
+            return None
+        return self._repo.partition_table(
+            shp.name,
+            schema=self._schema,
+            grid_size=self._partition_grid_size,
+            column=self._partition_column_for(shp.name),
+            max_partitions=self._partition_max_partitions,
+        )
+
+    def _partition_column_for(self, table: str) -> Optional[str]:
+        column = self._partition_column
+        if column and column not in self._repo.list_columns(table, schema=self._schema):
+            return None  # layer sem a coluna (ex.: sem código de município): cai na grade
+        return column
+
+    def _after_import(self, shp: ShapefileEntity, report: dict, advised: list[dict]) -> dict:
+        # tiles MVT gerados da versão anterior da tabela deixam de valer
+        if self._tile_cache is not None:
+            self._tile_cache.invalidate_layer(self._schema, shp.name)
+
+        report["reapplied_indexes"] = self._reapply_indexes(shp, advised)
+
+        # estimativa (não medição): custo de transformar os vértices do .shp evitado
+        shp_mb = os.path.getsize(shp.path) / (1024 * 1024)
+        report["estimated_reprojection_saved_seconds"] = (
+            0.0 if report["reprojected"] else round(shp_mb * self._reproject_seconds_per_mb, 3)
+        )
+        return report
+
+    @profiled("import_to_postgis")
+    def import_to_postgis(self, shp: ShapefileEntity, parallelism: Optional[int] = None) -> dict:
+        degree, feature_count = self._parallel_plan(shp, parallelism)
 
-    def import_to_postgis(self, shp: ShapefileEntity) -> None:
         # idempotente: drop + import
+        advised = self._advised_indexes(shp)
         self._repo.drop_table_if_exists(table=shp.name, schema=self._schema)
-        self._repo.import_with_ogr2ogr(shp, schema=self._schema)
+        if degree > 1:
+            report = self._repo.import_with_ogr2ogr_parallel(
+                shp, feature_count=feature_count, parallelism=degree, schema=self._schema
+            )
+        else:
+            report = self._repo.import_with_ogr2ogr(shp, schema=self._schema)
+        report["partitioning"] = self._partition_if_large(shp, feature_count)
+        return self._after_import(shp, report, advised)
 
+    @profiled("import_to_postgis")
+    async def import_to_postgis_async(self, shp: ShapefileEntity, parallelism: Optional[int] = None) -> dict:
+        """
+        Mesmo fluxo do import_to_postgis sem bloquear o event loop: ogr2ogr como
+        subprocesso asyncio e o trabalho de banco no pool dedicado (run_db).
+        """
+        degree, feature_count = self._parallel_plan(shp, parallelism)
+
+        advised = await run_db(self._advised_indexes, shp)
+        await run_db(self._repo.drop_table_if_exists, table=shp.name, schema=self._schema)
+        if degree > 1:
+            report = await run_db(
+                self._repo.import_with_ogr2ogr_parallel,
+                shp, feature_count=feature_count, parallelism=degree, schema=self._schema,
+            )
+        else:
+            report = await self._repo.import_with_ogr2ogr_async(shp, schema=self._schema)
+        report["partitioning"] = await run_db(self._partition_if_large, shp, feature_count)
+        return await run_db(self._after_import, shp, report, advised)
+
+    @profiled("publish_on_geoserver")
     def publish_on_geoserver(
         self,
         shp: ShapefileEntity,
@@ -115,6 +275,87 @@ class ShapefileService:
 
         return result
     
+    async def _publish_workspace_async(
+        self, shp: ShapefileEntity, workspace: str, datastore: str, final_sld: str
+    ) -> dict:
+        style_name = f"{shp.name}_style"
+        style_filename = f"{shp.name}.sld"
+
+        await self._gs_async.create_style_registration(style_name, workspace, style_filename)  # ::1
+        await self._gs_async.upload_style_sld(style_name, workspace, final_sld)                # ::2
+        await self._gs_async.create_featuretype(workspace, datastore, shp.name)                # ::3
+        await self._gs_async.set_default_style(shp.name, workspace, style_name)                # ::4
+        sld_len = await self._gs_async.get_style_sld_length(workspace, style_name)             # ::5
+        status = await self._gs_async.check_layer_status(shp.name, workspace)                  # ::6
+
+        return {
+            "layer": f"{workspace}:{shp.name}",
+            "style": style_name,
+            "sld_filename": style_filename,
+            "sld_ok": sld_len is not None and sld_len >= 50,
+            "sld_length": sld_len,
+            "http_status": status,
+        }
+
+    @profiled("publish_on_geoserver")
+    async def publish_on_geoserver_async(
+        self,
+        shp: ShapefileEntity,
+        workspace: str,
+        datastore: str,
+        sld_xml: Optional[str] = None,
+        publish_on_inde: bool = False,
+        inde_workspace: Optional[str] = None,
+        inde_datastore: Optional[str] = None,
+    ) -> dict:
+        """
+        Mesmo fluxo ::1..::6 do publish_on_geoserver via cliente HTTP assíncrono;
+        publicação principal e INDE (workspaces independentes) correm em paralelo.
+        """
+        if publish_on_inde and (not inde_workspace or not inde_datastore):
+            raise ValueError("INDE workspace/datastore não configurados.")
+
+        final_sld = sld_xml or build_basic_polygon_sld(shp.name)
+
+        targets = {"main": (workspace, datastore)}
+        if publish_on_inde:
+            targets["inde"] = (inde_workspace, inde_datastore)
+
+        results = await asyncio.gather(*(
+            self._publish_workspace_async(shp, ws, ds, final_sld) for ws, ds in targets.values()
+        ))
+        return dict(zip(targets.keys(), results))
+    
+    def list_partitions(self, layer: str) -> list[dict]:
+        return self._repo.list_partitions(layer, schema=self._schema)
+
+    def reload_partition(self, layer: str, cell: str, shp_path: str) -> dict:
+        """
+        Recarrega uma única partição de uma layer particionada, sem reimportar
+        as demais. A chave (grade ou coluna) segue a configuração atual de Partitioning.
+        """
+        if not self._repo.table_exists(layer, schema=self._schema):
+            raise LayerNotFoundError(f"Layer '{layer}' não encontrada no schema '{self._schema}'.")
+        if not self._repo.is_partitioned(layer, schema=self._schema):
+            raise ValueError(f"Layer '{layer}' não está particionada.")
+
+        shp = ShapefileEntity(
+            name=layer,
+            path=shp_path,
+            srid=self._repo.get_layer_srid(layer, schema=self._schema) or 4674,
+            source_srid=detect_prj_epsg(shp_path),
+        )
+        report = self._repo.reload_partition(
+            shp,
+            cell,
+            schema=self._schema,
+            grid_size=self._partition_grid_size,
+            column=self._partition_column_for(layer),
+        )
+        if self._tile_cache is not None:
+            self._tile_cache.invalidate_layer(self._schema, layer)
+        return report
+
     def list_layers(self) -> list[dict]:
         """
         Retorna todas as layers do schema configurado (self._schema).
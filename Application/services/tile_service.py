@@ -0,0 +1,126 @@
+# Application/services/tile_service.py
+import hashlib
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+from Data.db_context import get_db_context
+from Data.repositories.shapefile_repository import ShapefileRepository
+from Application.helpers.exceptions import LayerNotFoundError
+from Application.helpers.tile_cache import TileCache, get_tile_cache
+
+# largura do mundo em EPSG:3857 (metros)
+_WEB_MERCATOR_WORLD = 40075016.68557849
+
+
+def tile_cache_from_settings(settings) -> TileCache:
+    root = settings.TILES_CACHE_PATH or str(
+        Path(settings.UPLOAD_TEMP_PATH or tempfile.gettempdir()) / "fauno_tiles"
+    )
+    return get_tile_cache(root=root, max_items=settings.TILES_CACHE_MAX_ITEMS)
+
+
+class TileService:
+    def __init__(
+        self,
+        repo: ShapefileRepository,
+        cache: TileCache,
+        schema: str = "zcm",
+        extent: int = 4096,
+        buffer: int = 64,
+        simplify_pixels: float = 1.0,
+        simplify_max_zoom: int = 14,
+        attributes_min_zoom: int = 10,
+    ):
+        self._repo = repo
+        self._cache = cache
+        self._schema = schema
+        self._extent = extent
+        self._buffer = buffer
+        self._simplify_pixels = simplify_pixels
+        self._simplify_max_zoom = simplify_max_zoom
+        self._attributes_min_zoom = attributes_min_zoom
+
+    @classmethod
+    def create_from_settings(cls, settings) -> "TileService":
+        db = get_db_context(
+            host=settings.DB_HOST,
+            port=settings.DB_PORT,
+            user=settings.DB_USER,
+            password=settings.DB_PASSWORD,
+            db=settings.DB_NAME,
+        )
+        return cls(
+            repo=ShapefileRepository(db),
+            cache=tile_cache_from_settings(settings),
+            schema=settings.GEOSERVER_WORKSPACE or "public",
+            extent=settings.TILES_EXTENT,
+            buffer=settings.TILES_BUFFER,
+            simplify_pixels=settings.TILES_SIMPLIFY_PIXELS,
+            simplify_max_zoom=settings.TILES_SIMPLIFY_MAX_ZOOM,
+            attributes_min_zoom=settings.TILES_ATTRIBUTES_MIN_ZOOM,
+        )
+
+    # --- helpers ---
+    def _tolerance(self, z: int) -> float:
+        # tolerância de ~N pixels de tela (tile de 256px) no zoom pedido, em metros
+        if z >= self._simplify_max_zoom or self._simplify_pixels <= 0:
+            return 0.0
+        return (_WEB_MERCATOR_WORLD / (2 ** z)) / 256 * self._simplify_pixels
+
+    def _select_columns(self, layer: str, z: int, fields: Optional[list[str]]) -> list[str]:
+        available = self._repo.list_columns(table=layer, schema=self._schema)
+        if z < self._attributes_min_zoom:
+            # zoom baixo: só o identificador, os atributos só pesam no tile
+            return [c for c in available if c == "fid"]
+        if fields is None:
+            return available
+        unknown = [f for f in fields if f not in available]
+        if unknown:
+            raise ValueError(f"Atributos inexistentes na layer '{layer}': {', '.join(unknown)}")
+        return [c for c in available if c in fields]
+
+    def _variant(self, z: int, fields: Optional[list[str]]) -> str:
+        # chave derivada só do pedido, para o cache responder sem consultar o banco
+        if z < self._attributes_min_zoom:
+            return "fid"
+        if fields is None:
+            return "all"
+        return hashlib.sha1(",".join(sorted(fields)).encode("utf-8")).hexdigest()[:12]
+
+    # --- API ---
+    def get_tile(self, layer: str, z: int, x: int, y: int, fields: Optional[list[str]] = None) -> tuple[bytes, str]:
+        """
+        Retorna (tile MVT, ETag). Tiles quentes saem do cache sem tocar no banco.
+        """
+        if z < 0 or z > 30 or not (0 <= x < 2 ** z) or not (0 <= y < 2 ** z):
+            raise ValueError(f"Tile fora da grade: {z}/{x}/{y}")
+
+        variant = self._variant(z, fields)
+        cached = self._cache.get(self._schema, layer, z, x, y, variant)
+        if cached is not None:
+            return cached
+
+        srid = self._repo.get_layer_srid(table=layer, schema=self._schema)
+        if srid is None:
+            raise LayerNotFoundError(f"Layer '{layer}' não encontrada no schema '{self._schema}'.")
+
+        columns = self._select_columns(layer, z, fields)
+        tile = self._repo.get_mvt_tile(
+            table=layer,
+            schema=self._schema,
+            srid=srid,
+            z=z, x=x, y=y,
+            columns=columns,
+            tolerance=self._tolerance(z),
+            extent=self._extent,
+            buffer=self._buffer,
+            partitioned=self._repo.is_partitioned(table=layer, schema=self._schema),
+        )
+        return self._cache.put(self._schema, layer, z, x, y, variant, tile)
+
+    def invalidate_layer(self, layer: str) -> None:
+        self._cache.invalidate_layer(self._schema, layer)
+
+    def cache_stats(self) -> dict:
+        return self._cache.stats()
@@ -1,11 +1,67 @@
-from sqlalchemy import create_engine
-from sqlalchemy.engine import Engine
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Iterator, Optional
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import DBAPIError, InterfaceError
+
+from Entities.circuit_breaker import CircuitBreaker, get_breaker
 
 class DbContext:
-    def __init__(self, host: str, port: int, user: str, password: str, db: str):
+    def __init__(self, host: str, port: int, user: str, password: str, db: str, breaker: Optional[CircuitBreaker] = None):
         self._url = f"postgresql+psycopg2://{user}:{password}@{host}:{port}/{db}"
-        self._engine: Engine = create_engine(self._url, pool_pre_ping=True)
+        # connect_timeout: banco fora do ar falha em segundos, não no timeout TCP do SO
+        self._engine: Engine = create_engine(self._url, pool_pre_ping=True, connect_args={"connect_timeout": 5})
+        self._breaker = breaker or get_breaker("postgis")
 
     @property
     def engine(self) -> Engine:
         return self._engine
+
+    @property
+    def breaker(self) -> CircuitBreaker:
+        return self._breaker
+
+    @contextmanager
+    def _guarded(self, factory) -> Iterator[Connection]:
+        # só falha de conexão conta para o breaker: statement timeout, deadlock e
+        # serialização também são OperationalError, mas são respostas do banco
+        self._breaker.before_call()
+        acquired = False
+        try:
+            with factory() as conn:
+                acquired = True
+                yield conn
+        except DBAPIError as ex:
+            if not acquired or isinstance(ex, InterfaceError) or ex.connection_invalidated:
+                self._breaker.record_failure(ex)
+            else:
+                self._breaker.record_success()
+            raise
+        except BaseException:
+            self._breaker.record_success()
+            raise
+        else:
+            self._breaker.record_success()
+
+    def begin(self):
+        """engine.begin() protegido pelo circuit breaker do PostGIS."""
+        return self._guarded(self._engine.begin)
+
+    def connect(self):
+        """engine.connect() protegido pelo circuit breaker do PostGIS."""
+        return self._guarded(self._engine.connect)
+
+    def ping(self) -> None:
+        with self.connect() as conn:
+            conn.execute(text("SELECT 1"))
+
+    def pool_status(self) -> str:
+        return self._engine.pool.status()
+
+
+@lru_cache(maxsize=None)
+def get_db_context(host: str, port: int, user: str, password: str, db: str) -> DbContext:
+    # um engine (e um pool) por processo, em vez de um por request
+    return DbContext(host=host, port=port, user=user, password=password, db=db)
@@ -0,0 +1,38 @@
+import asyncio
+import contextvars
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from Application.helpers.profiler import profile_section
+
+# pool dedicado e limitado para trabalho bloqueante de banco (SQLAlchemy/psycopg2),
+# separado do threadpool do Starlette usado pelos endpoints leves
+_executor: Optional[ThreadPoolExecutor] = None
+_max_workers = 4
+
+
+def configure_db_executor(max_workers: int) -> None:
+    global _max_workers
+    _max_workers = max(1, int(max_workers))
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=_max_workers, thread_name_prefix="fauno-db")
+    return _executor
+
+
+def _profiled_call(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    # com sessão de profiling no contexto, o trabalho é perfilado na própria thread do pool
+    with profile_section(getattr(fn, "__name__", "run_db")):
+        return fn(*args, **kwargs)
+
+
+async def run_db(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Executa `fn` no pool de banco sem bloquear o event loop (propaga contextvars)."""
+    loop = asyncio.get_running_loop()
+    ctx = contextvars.copy_context()
+    call = functools.partial(ctx.run, _profiled_call, fn, *args, **kwargs)
+    return await loop.run_in_executor(_get_executor(), call)
@@ -1,15 +1,90 @@
 from abc import ABC, abstractmethod
+from typing import Iterator, Optional
 from Entities.shapefile_entity import ShapefileEntity
 
 class IShapefileRepository(ABC):
+    @abstractmethod
+    def ensure_available(self) -> None: ...
+
     @abstractmethod
     def drop_table_if_exists(self, table: str) -> None: ...
 
     @abstractmethod
-    def import_with_ogr2ogr(self, shp: ShapefileEntity, schema: str = "public") -> None: ...
+    def import_with_ogr2ogr(self, shp: ShapefileEntity, schema: str = "public") -> dict: ...
+
+    @abstractmethod
+    async def import_with_ogr2ogr_async(self, shp: ShapefileEntity, schema: str = "public") -> dict: ...
+
+    @abstractmethod
+    def import_with_ogr2ogr_parallel(
+        self, shp: ShapefileEntity, feature_count: int, parallelism: int, schema: str = "public",
+    ) -> dict: ...
 
     @abstractmethod
     def table_exists(self, table: str, schema: str = "public") -> bool: ...
 
     @abstractmethod
-    def list_layers(self, schema: str) -> list[dict]: ...
\ No newline at end of file
+    def list_layers(self, schema: str) -> list[dict]: ...
+
+    @abstractmethod
+    def get_layer_srid(self, table: str, schema: str = "public") -> int | None: ...
+
+    @abstractmethod
+    def list_columns(self, table: str, schema: str = "public") -> list[str]: ...
+
+    @abstractmethod
+    def table_usage_stats(self, schema: str) -> list[dict]: ...
+
+    @abstractmethod
+    def statement_stats(self, schema: str, limit: int = 500) -> Optional[list[dict]]: ...
+
+    @abstractmethod
+    def column_stats(self, table: str, schema: str = "public") -> dict[str, dict]: ...
+
+    @abstractmethod
+    def list_indexes(self, table: str, schema: str = "public") -> list[dict]: ...
+
+    @abstractmethod
+    def create_attribute_index(
+        self, table: str, column: str, method: str, schema: str = "public", concurrently: bool = True,
+    ) -> str: ...
+
+    @abstractmethod
+    def is_partitioned(self, table: str, schema: str = "public") -> bool: ...
+
+    @abstractmethod
+    def partition_table(
+        self, table: str, schema: str = "public", grid_size: float = 0.5,
+        column: Optional[str] = None, max_partitions: int = 256,
+    ) -> dict: ...
+
+    @abstractmethod
+    def reload_partition(
+        self, shp: ShapefileEntity, cell: str, schema: str = "public",
+        grid_size: float = 0.5, column: Optional[str] = None,
+    ) -> dict: ...
+
+    @abstractmethod
+    def list_partitions(self, table: str, schema: str = "public") -> list[dict]: ...
+
+    @abstractmethod
+    def get_mvt_tile(
+        self, table: str, schema: str, srid: int, z: int, x: int, y: int,
+        columns: list[str], tolerance: float, extent: int = 4096, buffer: int = 64,
+        partitioned: bool = False,
+    ) -> bytes: ...
+
+    @abstractmethod
+    def stream_geojson_features(
+        self, table: str, schema: str, srid: int, columns: list[str],
+        bbox: Optional[tuple[float, float, float, float]] = None,
+        filters: Optional[dict[str, str]] = None, batch_size: int = 5000,
+        partitioned: bool = False,
+    ) -> Iterator[list[str]]: ...
+
+    @abstractmethod
+    def export_with_ogr2ogr(
+        self, table: str, schema: str, dest_path: str, driver: str, columns: list[str],
+        bbox: Optional[tuple[float, float, float, float]] = None,
+        filters: Optional[dict[str, str]] = None, layer_options: Optional[list[str]] = None,
+    ) -> None: ...
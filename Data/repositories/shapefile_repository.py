@@ -1,17 +1,61 @@
+import asyncio
+import hashlib
+import logging
 import subprocess
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, Optional
+from psycopg2.errors import InsufficientPrivilege, ObjectNotInPrerequisiteState
 from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
 from Entities.shapefile_entity import ShapefileEntity
 from Data.db_context import DbContext
 from Data.interfaces.i_shapefile_repository import IShapefileRepository
 
+_log = logging.getLogger("fauno.import")
+_STDERR_TAIL_LINES = 200
+
+# COMMENT ON INDEX que marca os índices criados pelo advisor (reaplicados após reimport)
+ADVISED_INDEX_MARKER = "fauno:index-advisor"
+
+# armazenamento particionado: coluna-chave de partição e tabela de metadados (extent por partição)
+PARTITION_KEY_COLUMN = "fauno_cell"
+PARTITIONS_TABLE = "fauno_partitions"
+_DEFAULT_CELL = "_default"
+
+def _quote_ident(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+def _quote_literal(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+def _short_ident(name: str) -> str:
+    if len(name) <= 63:
+        return name
+    # limite de identificador do Postgres: corta e desambigua com hash
+    digest = hashlib.sha1(name.encode("utf-8")).hexdigest()[:8]
+    return f"{name[:50]}_{digest}"
+
 class ShapefileRepository(IShapefileRepository):
     def __init__(self, db: DbContext):
         self._db = db
 
+    def ensure_available(self) -> None:
+        """Falha na hora (CircuitOpenError) se o breaker do PostGIS estiver aberto."""
+        self._db.breaker.ensure_available()
+
     def drop_table_if_exists(self, table: str, schema: str = "public") -> None:
         sql = text(f'DROP TABLE IF EXISTS "{schema}"."{table}" CASCADE;')
-        with self._db.engine.begin() as conn:
+        with self._db.begin() as conn:
             conn.execute(sql)
+            # partições caem junto (CASCADE); os metadados de extent também precisam sair
+            if conn.execute(text("SELECT to_regclass(:rel)"), {"rel": f'"{schema}"."{PARTITIONS_TABLE}"'}).scalar():
+                conn.execute(
+                    text(f'DELETE FROM "{schema}"."{PARTITIONS_TABLE}" WHERE table_name = :table'),
+                    {"table": table},
+                )
 
     def table_exists(self, table: str, schema: str = "public") -> bool:
         sql = text("""
@@ -20,15 +64,25 @@ class ShapefileRepository(IShapefileRepository):
             WHERE table_schema = :schema AND table_name = :table
             LIMIT 1
         """)
-        with self._db.engine.begin() as conn:
+        with self._db.begin() as conn:
             row = conn.execute(sql, {"schema": schema, "table": table}).first()
             return row is not None
 
-    def import_with_ogr2ogr(self, shp: ShapefileEntity, schema: str = "public") -> None:
-        # Requer GDAL (ogr2ogr) instalado no sistema
+    @staticmethod
+    def _srs_args(shp: ShapefileEntity) -> list[str]:
+        # mesmo SRID: só atribui, sem transformar cada vértice
+        if shp.source_srid is not None and shp.source_srid == shp.srid:
+            return ["-a_srs", f"EPSG:{shp.srid}"]
+        # origem conhecida e diferente: declara a origem explicitamente
+        if shp.source_srid is not None:
+            return ["-s_srs", f"EPSG:{shp.source_srid}", "-t_srs", f"EPSG:{shp.srid}"]
+        # origem desconhecida: o GDAL interpreta o .prj por conta própria
+        return ["-t_srs", f"EPSG:{shp.srid}"]
+
+    def _import_cmd(self, shp: ShapefileEntity, schema: str) -> list[str]:
         conn_str = self._db._url.replace("+psycopg2", "")
         # força SRID, cria geometria e índice espacial padrão
-        cmd = [
+        return [
             "ogr2ogr",
             "-f", "PostgreSQL",
             conn_str,
@@ -38,11 +92,174 @@ class ShapefileRepository(IShapefileRepository):
             "-lco", "FID=fid",
             "-nlt", "PROMOTE_TO_MULTI",
             "-overwrite",
-            "-t_srs", f"EPSG:{shp.srid}"
+            *self._srs_args(shp),
         ]
-        proc = subprocess.run(cmd, capture_output=True, text=True)
+
+    def _import_report(self, shp: ShapefileEntity, started: float) -> dict:
+        return {
+            "source_srid": shp.source_srid,
+            "target_srid": shp.srid,
+            "reprojected": self._srs_args(shp)[0] != "-a_srs",
+            "seconds": round(time.perf_counter() - started, 3),
+            "mode": "single",
+        }
+
+    def import_with_ogr2ogr(self, shp: ShapefileEntity, schema: str = "public") -> dict:
+        # Requer GDAL (ogr2ogr) instalado no sistema
+        started = time.perf_counter()
+        proc = subprocess.run(self._import_cmd(shp, schema), capture_output=True, text=True)
         if proc.returncode != 0:
             raise RuntimeError(f"ogr2ogr falhou: {proc.stderr}")
+        return self._import_report(shp, started)
+
+    async def import_with_ogr2ogr_async(self, shp: ShapefileEntity, schema: str = "public") -> dict:
+        """
+        Mesmo import, como subprocesso asyncio: o event loop segue livre e o
+        stderr do ogr2ogr é lido linha a linha (log + últimas linhas para o erro).
+        """
+        started = time.perf_counter()
+        proc = await asyncio.create_subprocess_exec(
+            *self._import_cmd(shp, schema),
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        tail: deque[str] = deque(maxlen=_STDERR_TAIL_LINES)
+        async for raw in proc.stderr:
+            line = raw.decode("utf-8", errors="replace").rstrip()
+            if line:
+                tail.append(line)
+                _log.info("ogr2ogr[%s]: %s", shp.name, line)
+        if await proc.wait() != 0:
+            raise RuntimeError("ogr2ogr falhou: " + "\n".join(tail))
+        return self._import_report(shp, started)
+
+    def import_with_ogr2ogr_parallel(
+        self,
+        shp: ShapefileEntity,
+        feature_count: int,
+        parallelism: int,
+        schema: str = "public",
+    ) -> dict:
+        """
+        Importação particionada: N processos ogr2ogr, cada um com sua conexão e
+        uma faixa de FIDs, carregam em paralelo uma tabela de staging UNLOGGED
+        sem índices; PK e índice GIST são criados uma única vez no final.
+        """
+        conn_str = self._db._url.replace("+psycopg2", "")
+        srs_args = self._srs_args(shp)
+        staging = f"{shp.name}__staging"
+        base = [
+            "ogr2ogr",
+            "-f", "PostgreSQL",
+            conn_str,
+            shp.path,
+            "-nln", f"{schema}.{staging}",
+            "-nlt", "PROMOTE_TO_MULTI",
+            *srs_args,
+        ]
+        phases: dict[str, float] = {}
+        started = time.perf_counter()
+
+        # 1) estrutura vazia da staging (sem índice espacial), depois sem PK e UNLOGGED
+        self.drop_table_if_exists(table=staging, schema=schema)
+        # a layer antiga já foi removida: qualquer falha daqui em diante não pode deixar a staging órfã
+        try:
+            cmd = base + [
+                "-lco", "GEOMETRY_NAME=geom",
+                "-lco", "FID=fid",
+                "-lco", "SPATIAL_INDEX=NONE",
+                "-overwrite",
+                "-where", "FID < 0",
+            ]
+            proc = subprocess.run(cmd, capture_output=True, text=True)
+            if proc.returncode != 0:
+                raise RuntimeError(f"ogr2ogr (staging) falhou: {proc.stderr}")
+
+            with self._db.begin() as conn:
+                pk = conn.execute(text("""
+                    SELECT conname FROM pg_constraint
+                    WHERE conrelid = CAST(:rel AS regclass) AND contype = 'p'
+                """), {"rel": f'"{schema}"."{staging}"'}).scalar()
+                if pk:
+                    conn.execute(text(f'ALTER TABLE "{schema}"."{staging}" DROP CONSTRAINT {_quote_ident(pk)}'))
+                conn.execute(text(f'ALTER TABLE "{schema}"."{staging}" SET UNLOGGED'))
+            phases["prepare"] = round(time.perf_counter() - started, 3)
+
+            # 2) faixas de FID carregadas em paralelo (COPY, FIDs do shapefile preservados)
+            parallelism = max(1, min(parallelism, feature_count or 1))
+            step = -(-feature_count // parallelism)  # ceil
+            ranges = [(lo, min(lo + step, feature_count)) for lo in range(0, feature_count, step)]
+
+            def load(bounds: tuple[int, int]) -> dict:
+                lo, hi = bounds
+                t = time.perf_counter()
+                cmd = base + [
+                    "--config", "PG_USE_COPY", "YES",
+                    "-append",
+                    "-preserve_fid",
+                    # OGR só usa índice para FID = / FID IN: cada processo lê o .shp/.dbf
+                    # inteiro e descarta o que está fora da faixa; o ganho vem da
+                    # conversão e do COPY em paralelo
+                    "-where", f"FID >= {lo} AND FID < {hi}",
+                ]
+                proc = subprocess.run(cmd, capture_output=True, text=True)
+                if proc.returncode != 0:
+                    raise RuntimeError(f"ogr2ogr (faixa {lo}-{hi}) falhou: {proc.stderr}")
+                return {"from_fid": lo, "to_fid": hi, "seconds": round(time.perf_counter() - t, 3)}
+
+            t_load = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=len(ranges)) as pool:
+                chunks = list(pool.map(load, ranges))
+            phases["load"] = round(time.perf_counter() - t_load, 3)
+
+            # 3) vira a tabela definitiva: LOGGED, PK, GIST e estatísticas, uma vez só
+            t_fin = time.perf_counter()
+            with self._db.begin() as conn:
+                seq = conn.execute(
+                    text("SELECT pg_get_serial_sequence(:rel, 'fid')"), {"rel": f'"{schema}"."{staging}"'}
+                ).scalar()
+                conn.execute(text(f'ALTER TABLE "{schema}"."{staging}" SET LOGGED'))
+                conn.execute(text(f'ALTER TABLE "{schema}"."{staging}" RENAME TO "{shp.name}"'))
+                # a sequence do fid acompanha o nome da tabela (senão fica com o sufixo __staging)
+                if seq:
+                    seq_name = _quote_ident(_short_ident(f"{shp.name}_fid_seq"))
+                    conn.execute(text(f"ALTER SEQUENCE {seq} RENAME TO {seq_name}"))
+                conn.execute(text(f'ALTER TABLE "{schema}"."{shp.name}" ADD PRIMARY KEY (fid)'))
+                conn.execute(text(
+                    f'CREATE INDEX "{shp.name}_geom_geom_idx" ON "{schema}"."{shp.name}" USING GIST (geom)'
+                ))
+                # mantém a sequence do fid à frente dos FIDs preservados
+                conn.execute(text(f"""
+                    SELECT setval(pg_get_serial_sequence('"{schema}"."{shp.name}"', 'fid'),
+                                  COALESCE((SELECT MAX(fid) FROM "{schema}"."{shp.name}"), 0) + 1, false)
+                """))
+        except Exception:
+            self.drop_table_if_exists(table=staging, schema=schema)
+            raise
+
+        with self._db.connect() as conn:
+            conn.execution_options(isolation_level="AUTOCOMMIT")
+            conn.execute(text(f'ANALYZE "{schema}"."{shp.name}"'))
+        phases["finalize"] = round(time.perf_counter() - t_fin, 3)
+
+        wall = time.perf_counter() - started
+        busy = sum(c["seconds"] for c in chunks)
+        return {
+            "source_srid": shp.source_srid,
+            "target_srid": shp.srid,
+            "reprojected": srs_args[0] != "-a_srs",
+            "seconds": round(wall, 3),
+            "mode": "parallel",
+            "parallelism": len(ranges),
+            "feature_count": feature_count,
+            "phases": phases,
+            "chunks": chunks,
+            # fração do tempo de carga em que os N workers estiveram ocupados (1.0 = sobreposição total);
+            # não é ganho sobre uma carga em processo único, que não é medida
+            "parallel_efficiency": (
+                round(busy / (phases["load"] * len(ranges)), 2) if phases["load"] > 0 else None
+            ),
+        }
 
     def list_layers(self, schema: str) -> list[dict]:
         """
@@ -57,10 +274,546 @@ class ShapefileRepository(IShapefileRepository):
                 coord_dimension,
                 srid,
                 type
-            FROM public.geometry_columns
+            FROM public.geometry_columns g
             WHERE f_table_schema = :schema
+              -- partições de layers particionadas não são layers próprias
+              AND NOT EXISTS (
+                  SELECT 1 FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace
+                  WHERE n.nspname = g.f_table_schema AND c.relname = g.f_table_name AND c.relispartition
+              )
             ORDER BY f_table_name
         """)
-        with self._db.engine.begin() as conn:
+        with self._db.begin() as conn:
             rows = conn.execute(sql, {"schema": schema}).mappings().all()
-            return [dict(r) for r in rows]
\ No newline at end of file
+            return [dict(r) for r in rows]
+
+    def get_layer_srid(self, table: str, schema: str = "public") -> int | None:
+        sql = text("""
+            SELECT srid
+            FROM public.geometry_columns
+            WHERE f_table_schema = :schema AND f_table_name = :table AND f_geometry_column = 'geom'
+            LIMIT 1
+        """)
+        with self._db.begin() as conn:
+            row = conn.execute(sql, {"schema": schema, "table": table}).first()
+            return int(row[0]) if row is not None else None
+
+    def list_columns(self, table: str, schema: str = "public") -> list[str]:
+        """
+        Colunas de atributo da tabela (sem a geometria), na ordem física.
+        """
+        sql = text("""
+            SELECT column_name
+            FROM information_schema.columns
+            WHERE table_schema = :schema AND table_name = :table AND column_name NOT IN ('geom', :key)
+            ORDER BY ordinal_position
+        """)
+        with self._db.begin() as conn:
+            rows = conn.execute(sql, {"schema": schema, "table": table, "key": PARTITION_KEY_COLUMN}).all()
+            return [r[0] for r in rows]
+
+    # --- estatísticas e índices de atributo (index advisor) ---
+    def table_usage_stats(self, schema: str) -> list[dict]:
+        """Varreduras por tabela do schema (pg_stat_user_tables)."""
+        # partições somam na layer (tabela pai), que é o que o GeoServer consulta
+        sql = text("""
+            SELECT COALESCE(par.relname, s.relname) AS table,
+                   SUM(s.n_live_tup)::bigint AS n_live_tup,
+                   SUM(s.seq_scan)::bigint AS seq_scan,
+                   SUM(s.seq_tup_read)::bigint AS seq_tup_read,
+                   SUM(COALESCE(s.idx_scan, 0))::bigint AS idx_scan
+            FROM pg_stat_user_tables s
+            LEFT JOIN pg_inherits i ON i.inhrelid = s.relid
+            LEFT JOIN pg_class par ON par.oid = i.inhparent
+            WHERE s.schemaname = :schema
+            GROUP BY 1
+            ORDER BY seq_tup_read DESC
+        """)
+        with self._db.begin() as conn:
+            return [dict(r) for r in conn.execute(sql, {"schema": schema}).mappings().all()]
+
+    def statement_stats(self, schema: str, limit: int = 500) -> Optional[list[dict]]:
+        """
+        Queries normalizadas do pg_stat_statements que citam o schema.
+        None quando a extensão não está instalada/carregada.
+        """
+        # shared_preload_libraries só é legível por superuser / pg_read_all_settings: em vez de
+        # consultá-lo, a leitura roda num SAVEPOINT e "não carregada"/"sem permissão" viram None
+        probe = text("SELECT EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_stat_statements')")
+        sql = text("""
+            SELECT query, calls, total_exec_time AS total_exec_ms, mean_exec_time AS mean_exec_ms
+            FROM pg_stat_statements
+            WHERE query ILIKE :pattern
+            ORDER BY calls DESC
+            LIMIT :limit
+        """)
+        with self._db.begin() as conn:
+            if not conn.execute(probe).scalar():
+                return None
+            try:
+                with conn.begin_nested():
+                    rows = conn.execute(sql, {"pattern": f"%{schema}%", "limit": limit}).mappings().all()
+            except DBAPIError as ex:
+                if isinstance(ex.orig, (ObjectNotInPrerequisiteState, InsufficientPrivilege)):
+                    return None
+                raise
+            return [dict(r) for r in rows]
+
+    def column_stats(self, table: str, schema: str = "public") -> dict[str, dict]:
+        """Tipo e correlação física (pg_stats) das colunas de atributo."""
+        sql = text("""
+            SELECT c.column_name, c.data_type, s.correlation, s.n_distinct
+            FROM information_schema.columns c
+            LEFT JOIN pg_stats s
+              ON s.schemaname = c.table_schema AND s.tablename = c.table_name AND s.attname = c.column_name
+            WHERE c.table_schema = :schema AND c.table_name = :table AND c.column_name NOT IN ('geom', :key)
+            ORDER BY c.ordinal_position
+        """)
+        with self._db.begin() as conn:
+            rows = conn.execute(sql, {"schema": schema, "table": table, "key": PARTITION_KEY_COLUMN}).mappings().all()
+            return {r["column_name"]: dict(r) for r in rows}
+
+    def list_indexes(self, table: str, schema: str = "public") -> list[dict]:
+        """Índices da tabela pela primeira coluna, com o método e se foram criados pelo advisor."""
+        sql = text("""
+            SELECT i.relname AS index_name, a.attname AS column, am.amname AS method,
+                   COALESCE(obj_description(i.oid, 'pg_class') = :marker, false) AS advised
+            FROM pg_index x
+            JOIN pg_class t ON t.oid = x.indrelid
+            JOIN pg_namespace n ON n.oid = t.relnamespace
+            JOIN pg_class i ON i.oid = x.indexrelid
+            JOIN pg_am am ON am.oid = i.relam
+            JOIN pg_attribute a ON a.attrelid = t.oid AND a.attnum = x.indkey[0]
+            WHERE n.nspname = :schema AND t.relname = :table
+        """)
+        with self._db.begin() as conn:
+            rows = conn.execute(sql, {"schema": schema, "table": table, "marker": ADVISED_INDEX_MARKER}).mappings().all()
+            return [dict(r) for r in rows]
+
+    @staticmethod
+    def attribute_index_name(table: str, column: str, method: str) -> str:
+        return _short_ident(f"{table}_{column}_{method}_idx")
+
+    def create_attribute_index(
+        self, table: str, column: str, method: str, schema: str = "public", concurrently: bool = True,
+    ) -> str:
+        """
+        CREATE INDEX [CONCURRENTLY] marcado como do advisor. CONCURRENTLY não
+        bloqueia as leituras do GeoServer, mas exige autocommit; se falhar,
+        o índice INVALID que sobra é removido.
+        """
+        if method not in ("btree", "brin"):
+            raise ValueError(f"Método de índice não suportado: {method}")
+        name = self.attribute_index_name(table, column, method)
+        qualified = f"{_quote_ident(schema)}.{_quote_ident(name)}"
+        # Postgres não aceita CONCURRENTLY em tabela particionada; sem ele só as escritas esperam
+        if concurrently and self.is_partitioned(table, schema):
+            concurrently = False
+        mode = "CONCURRENTLY " if concurrently else ""
+        with self._db.connect() as conn:
+            conn.execution_options(isolation_level="AUTOCOMMIT")
+            try:
+                conn.execute(text(
+                    f"CREATE INDEX {mode}IF NOT EXISTS {_quote_ident(name)} "
+                    f"ON {_quote_ident(schema)}.{_quote_ident(table)} USING {method} ({_quote_ident(column)})"
+                ))
+            except Exception:
+                conn.execute(text(f"DROP INDEX {mode}IF EXISTS {qualified}"))
+                raise
+            conn.execute(text(f"COMMENT ON INDEX {qualified} IS '{ADVISED_INDEX_MARKER}'"))
+        return name
+
+    # --- armazenamento particionado ---
+    def is_partitioned(self, table: str, schema: str = "public") -> bool:
+        sql = text("""
+            SELECT c.relkind = 'p'
+            FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE n.nspname = :schema AND c.relname = :table
+        """)
+        with self._db.begin() as conn:
+            return bool(conn.execute(sql, {"schema": schema, "table": table}).scalar())
+
+    @staticmethod
+    def _partition_prune(schema: str, table: str, envelope_sql: str) -> str:
+        """
+        Restringe a chave de partição às células cujo extent cruza o envelope.
+        Subquery não correlacionada (initplan): o Postgres poda as partições na execução.
+        """
+        return f"""t.{_quote_ident(PARTITION_KEY_COLUMN)} = ANY(ARRAY(
+            SELECT p.cell FROM "{schema}"."{PARTITIONS_TABLE}" p, (SELECT {envelope_sql} AS e) env
+            WHERE p.table_name = {_quote_literal(table)}
+              AND (p.xmin IS NULL OR (p.xmin <= ST_XMax(env.e) AND p.xmax >= ST_XMin(env.e)
+                                      AND p.ymin <= ST_YMax(env.e) AND p.ymax >= ST_YMin(env.e)))
+        ))"""
+
+    @staticmethod
+    def _partition_key_sql(grid_size: float, column: Optional[str]) -> str:
+        # chave de partição de cada linha (alias l): coluna ou célula de grade do centro do bbox
+        if column:
+            return f"COALESCE(l.{_quote_ident(column)}::text, '_null')"
+        size = float(grid_size)
+        return (
+            f"COALESCE(floor((ST_XMin(l.geom) + ST_XMax(l.geom)) / 2 / {size})::bigint || '_' || "
+            f"floor((ST_YMin(l.geom) + ST_YMax(l.geom)) / 2 / {size})::bigint, '_empty')"
+        )
+
+    def partition_table(
+        self,
+        table: str,
+        schema: str = "public",
+        grid_size: float = 0.5,
+        column: Optional[str] = None,
+        max_partitions: int = 256,
+    ) -> dict:
+        """
+        Converte a tabela importada em tabela particionada (LIST) pela célula de
+        grade do centro do bbox de cada feição (ou por `column`, ex.: código do
+        município), com GIST e PK por partição e o extent de cada partição em
+        `fauno_partitions` para a poda por bbox. Tudo numa transação.
+        """
+        started = time.perf_counter()
+        qtable = f"{_quote_ident(schema)}.{_quote_ident(table)}"
+        load = _short_ident(f"{table}__load")
+        qload = f"{_quote_ident(schema)}.{_quote_ident(load)}"
+        key_sql = self._partition_key_sql(grid_size, column)
+
+        with self._db.begin() as conn:
+            cells = conn.execute(text(f"""
+                SELECT {key_sql} AS cell, COUNT(*) AS features,
+                       ST_XMin(ST_Extent(l.geom)) AS xmin, ST_YMin(ST_Extent(l.geom)) AS ymin,
+                       ST_XMax(ST_Extent(l.geom)) AS xmax, ST_YMax(ST_Extent(l.geom)) AS ymax
+                FROM {qtable} l
+                GROUP BY 1
+                ORDER BY 1
+            """)).mappings().all()
+            if len(cells) > max_partitions:
+                return {
+                    "partitioned": False,
+                    "reason": f"{len(cells)} partições > limite de {max_partitions}",
+                    "seconds": round(time.perf_counter() - started, 3),
+                }
+
+            # a tabela do ogr2ogr vira a origem da carga; nomes de PK/índice ficam livres para a nova
+            seq = conn.execute(text("SELECT pg_get_serial_sequence(:rel, 'fid')"), {"rel": qtable}).scalar()
+            conn.execute(text(f"ALTER TABLE {qtable} RENAME TO {_quote_ident(load)}"))
+            conn.execute(text(f'ALTER TABLE {qload} DROP CONSTRAINT IF EXISTS {_quote_ident(table + "_pkey")}'))
+            conn.execute(text(f'DROP INDEX IF EXISTS {_quote_ident(schema)}.{_quote_ident(table + "_geom_geom_idx")}'))
+            if seq:
+                conn.execute(text(f"ALTER SEQUENCE {seq} OWNED BY NONE"))
+
+            # DEFAULT na chave: inserts posteriores (ex.: WFS-T) caem na partição default
+            conn.execute(text(f"""
+                CREATE TABLE {qtable} (
+                    LIKE {qload} INCLUDING DEFAULTS,
+                    {_quote_ident(PARTITION_KEY_COLUMN)} text NOT NULL DEFAULT {_quote_literal(_DEFAULT_CELL)}
+                ) PARTITION BY LIST ({_quote_ident(PARTITION_KEY_COLUMN)})
+            """))
+            partitions = []
+            for i, cell in enumerate(cells):
+                name = _short_ident(f"{table}__p{i:04d}")
+                conn.execute(text(
+                    f"CREATE TABLE {_quote_ident(schema)}.{_quote_ident(name)} "
+                    f"PARTITION OF {qtable} FOR VALUES IN ({_quote_literal(cell['cell'])})"
+                ))
+                partitions.append({**dict(cell), "partition": name})
+            default_name = _short_ident(f"{table}__pdefault")
+            conn.execute(text(f"CREATE TABLE {_quote_ident(schema)}.{_quote_ident(default_name)} PARTITION OF {qtable} DEFAULT"))
+
+            # carga antes dos índices (mais rápido); o Postgres roteia cada linha para a partição
+            conn.execute(text(f"INSERT INTO {qtable} SELECT l.*, {key_sql} FROM {qload} l"))
+            # índices no pai são criados em cada partição
+            conn.execute(text(f"ALTER TABLE {qtable} ADD PRIMARY KEY (fid, {_quote_ident(PARTITION_KEY_COLUMN)})"))
+            conn.execute(text(f'CREATE INDEX {_quote_ident(table + "_geom_geom_idx")} ON {qtable} USING GIST (geom)'))
+            if seq:
+                conn.execute(text(f"ALTER SEQUENCE {seq} OWNED BY {qtable}.fid"))
+            conn.execute(text(f"DROP TABLE {qload}"))
+
+            conn.execute(text(f"""
+                CREATE TABLE IF NOT EXISTS "{schema}"."{PARTITIONS_TABLE}" (
+                    table_name text NOT NULL,
+                    cell text NOT NULL,
+                    partition_name text NOT NULL,
+                    features bigint NOT NULL,
+                    xmin double precision, ymin double precision,
+                    xmax double precision, ymax double precision,
+                    PRIMARY KEY (table_name, cell)
+                )
+            """))
+            conn.execute(text(f'DELETE FROM "{schema}"."{PARTITIONS_TABLE}" WHERE table_name = :table'), {"table": table})
+            # a default entra sem extent: é sempre incluída na poda
+            rows = [{**p, "table_name": table} for p in partitions] + [{
+                "table_name": table, "cell": _DEFAULT_CELL, "partition": default_name, "features": 0,
+                "xmin": None, "ymin": None, "xmax": None, "ymax": None,
+            }]
+            conn.execute(text(f"""
+                INSERT INTO "{schema}"."{PARTITIONS_TABLE}"
+                    (table_name, cell, partition_name, features, xmin, ymin, xmax, ymax)
+                VALUES (:table_name, :cell, :partition, :features, :xmin, :ymin, :xmax, :ymax)
+            """), rows)
+
+        with self._db.connect() as conn:
+            conn.execution_options(isolation_level="AUTOCOMMIT")
+            conn.execute(text(f"ANALYZE {qtable}"))
+
+        return {
+            "partitioned": True,
+            "key": f"column:{column}" if column else f"grid:{grid_size}",
+            "partitions": len(partitions),
+            "largest_partition_features": max((p["features"] for p in partitions), default=0),
+            "seconds": round(time.perf_counter() - started, 3),
+        }
+
+    def reload_partition(
+        self,
+        shp: ShapefileEntity,
+        cell: str,
+        schema: str = "public",
+        grid_size: float = 0.5,
+        column: Optional[str] = None,
+    ) -> dict:
+        """
+        Recarrega só a partição `cell` da tabela particionada `shp.name` a partir
+        do shapefile: staging via ogr2ogr, TRUNCATE da partição, carga das feições
+        da célula e extent atualizado em `fauno_partitions`, numa transação.
+        Feições de outras células são ignoradas (contadas em `outside_cell`).
+        """
+        if cell == _DEFAULT_CELL:
+            raise ValueError("A partição default não tem chave própria: reimporte a layer inteira.")
+        started = time.perf_counter()
+        table = shp.name
+        qtable = f"{_quote_ident(schema)}.{_quote_ident(table)}"
+        # nome único: recargas simultâneas da mesma layer não disputam a mesma staging
+        staging = _short_ident(f"{table}__reload_{uuid.uuid4().hex[:8]}")
+        qstaging = f"{_quote_ident(schema)}.{_quote_ident(staging)}"
+        key_sql = self._partition_key_sql(grid_size, column)
+
+        with self._db.begin() as conn:
+            partition = conn.execute(text(f"""
+                SELECT partition_name FROM "{schema}"."{PARTITIONS_TABLE}"
+                WHERE table_name = :table AND cell = :cell
+            """), {"table": table, "cell": cell}).scalar()
+        if partition is None:
+            raise ValueError(f"Partição '{cell}' não encontrada na layer {table}.")
+        qpartition = f"{_quote_ident(schema)}.{_quote_ident(partition)}"
+
+        self.drop_table_if_exists(table=staging, schema=schema)
+        proc = subprocess.run([
+            "ogr2ogr",
+            "-f", "PostgreSQL",
+            self._db._url.replace("+psycopg2", ""),
+            shp.path,
+            "-nln", f"{schema}.{staging}",
+            "-lco", "GEOMETRY_NAME=geom",
+            "-lco", "FID=fid",
+            "-lco", "SPATIAL_INDEX=NONE",
+            "-nlt", "PROMOTE_TO_MULTI",
+            "-overwrite",
+            *self._srs_args(shp),
+        ], capture_output=True, text=True)
+        if proc.returncode != 0:
+            self.drop_table_if_exists(table=staging, schema=schema)
+            raise RuntimeError(f"ogr2ogr (partição {cell}) falhou: {proc.stderr}")
+
+        try:
+            # fid fica de fora: as linhas novas numeram pela sequence da tabela
+            columns = ["geom"] + [c for c in self.list_columns(table, schema=schema) if c != "fid"]
+            missing = set(columns) - set(self.list_columns(staging, schema=schema)) - {"geom"}
+            if missing:
+                raise ValueError(f"Shapefile sem as colunas da layer: {', '.join(sorted(missing))}")
+            cols = ", ".join(_quote_ident(c) for c in columns)
+            src = ", ".join(f"l.{_quote_ident(c)}" for c in columns)
+
+            with self._db.begin() as conn:
+                conn.execute(text(f"TRUNCATE {qpartition}"))
+                loaded = conn.execute(text(f"""
+                    INSERT INTO {qtable} ({cols}, {_quote_ident(PARTITION_KEY_COLUMN)})
+                    SELECT {src}, {key_sql} FROM {qstaging} l
+                    WHERE {key_sql} = :cell
+                """), {"cell": cell}).rowcount
+                total = conn.execute(text(f"SELECT COUNT(*) FROM {qstaging}")).scalar()
+                extent = conn.execute(text(f"""
+                    SELECT ST_XMin(ST_Extent(geom)) AS xmin, ST_YMin(ST_Extent(geom)) AS ymin,
+                           ST_XMax(ST_Extent(geom)) AS xmax, ST_YMax(ST_Extent(geom)) AS ymax
+                    FROM {qpartition}
+                """)).mappings().one()
+                conn.execute(text(f"""
+                    UPDATE "{schema}"."{PARTITIONS_TABLE}"
+                    SET features = :features, xmin = :xmin, ymin = :ymin, xmax = :xmax, ymax = :ymax
+                    WHERE table_name = :table AND cell = :cell
+                """), {**dict(extent), "features": loaded, "table": table, "cell": cell})
+        finally:
+            self.drop_table_if_exists(table=staging, schema=schema)
+
+        with self._db.connect() as conn:
+            conn.execution_options(isolation_level="AUTOCOMMIT")
+            conn.execute(text(f"ANALYZE {qpartition}"))
+
+        return {
+            "cell": cell,
+            "partition": partition,
+            "features": loaded,
+            "outside_cell": total - loaded,
+            "seconds": round(time.perf_counter() - started, 3),
+        }
+
+    def list_partitions(self, table: str, schema: str = "public") -> list[dict]:
+        sql = text(f"""
+            SELECT cell, partition_name, features, xmin, ymin, xmax, ymax
+            FROM "{schema}"."{PARTITIONS_TABLE}"
+            WHERE table_name = :table
+            ORDER BY cell
+        """)
+        with self._db.begin() as conn:
+            if not conn.execute(text("SELECT to_regclass(:rel)"), {"rel": f'"{schema}"."{PARTITIONS_TABLE}"'}).scalar():
+                return []
+            return [dict(r) for r in conn.execute(sql, {"table": table}).mappings().all()]
+
+    def get_mvt_tile(
+        self,
+        table: str,
+        schema: str,
+        srid: int,
+        z: int,
+        x: int,
+        y: int,
+        columns: list[str],
+        tolerance: float,
+        extent: int = 4096,
+        buffer: int = 64,
+        partitioned: bool = False,
+    ) -> bytes:
+        """
+        Gera o tile MVT (EPSG:3857) direto no PostGIS com ST_AsMVT/ST_AsMVTGeom.
+        O filtro espacial é feito no SRID da tabela para usar o índice GIST de `geom`;
+        em layer particionada, só as partições que cruzam o tile são lidas.
+        """
+        attrs = "".join(f", t.{_quote_ident(c)}" for c in columns)
+        prune = ""
+        if partitioned:
+            prune = " AND " + self._partition_prune(
+                schema, table, "ST_Transform(ST_TileEnvelope(:z, :x, :y, margin => :margin), :srid)"
+            )
+        geom = "ST_Transform(t.geom, 3857)"
+        if tolerance > 0:
+            geom = f"ST_SimplifyPreserveTopology({geom}, :tolerance)"
+
+        sql = text(f"""
+            WITH bounds AS (
+                SELECT
+                    ST_TileEnvelope(:z, :x, :y) AS env,
+                    ST_Transform(ST_TileEnvelope(:z, :x, :y, margin => :margin), :srid) AS env_src
+            ),
+            mvtgeom AS (
+                SELECT ST_AsMVTGeom({geom}, bounds.env, :extent, :buffer, true) AS geom{attrs}
+                FROM "{schema}"."{table}" t, bounds
+                WHERE t.geom && bounds.env_src{prune}
+            )
+            SELECT ST_AsMVT(mvtgeom.*, :layer, :extent, 'geom')
+            FROM mvtgeom
+            WHERE mvtgeom.geom IS NOT NULL
+        """)
+        params = {
+            "z": z, "x": x, "y": y,
+            "srid": srid,
+            "margin": buffer / extent,
+            "extent": extent,
+            "buffer": buffer,
+            "layer": table,
+        }
+        if tolerance > 0:
+            params["tolerance"] = tolerance
+        with self._db.begin() as conn:
+            tile = conn.execute(sql, params).scalar()
+            return bytes(tile) if tile is not None else b""
+
+    def _feature_filters(
+        self,
+        srid: int,
+        bbox: Optional[tuple[float, float, float, float]],
+        filters: Optional[dict[str, str]],
+        prune: Optional[tuple[str, str]] = None,
+    ) -> tuple[str, dict]:
+        clauses, params = [], {}
+        if bbox is not None:
+            envelope = "ST_Transform(ST_MakeEnvelope(:xmin, :ymin, :xmax, :ymax, 4326), :srid)"
+            clauses.append(f"t.geom && {envelope}")
+            if prune is not None:
+                clauses.append(self._partition_prune(prune[0], prune[1], envelope))
+            params.update({"xmin": bbox[0], "ymin": bbox[1], "xmax": bbox[2], "ymax": bbox[3], "srid": srid})
+        for i, (col, value) in enumerate((filters or {}).items()):
+            # valor vai como literal sem tipo: o Postgres converte para o tipo da coluna (mantém índices)
+            clauses.append(f"t.{_quote_ident(col)} = :f{i}")
+            params[f"f{i}"] = value
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def stream_geojson_features(
+        self,
+        table: str,
+        schema: str,
+        srid: int,
+        columns: list[str],
+        bbox: Optional[tuple[float, float, float, float]] = None,
+        filters: Optional[dict[str, str]] = None,
+        batch_size: int = 5000,
+        partitioned: bool = False,
+    ) -> Iterator[list[str]]:
+        """
+        Gera lotes de Features GeoJSON (EPSG:4326, já serializadas pelo PostGIS)
+        a partir de um cursor no servidor: a memória não cresce com o tamanho da layer.
+        """
+        props = ", ".join(f"t.{_quote_ident(c)}" for c in columns)
+        props_sql = f"(SELECT to_jsonb(p) FROM (SELECT {props}) p)" if columns else "'{}'::jsonb"
+        where, params = self._feature_filters(srid, bbox, filters, prune=(schema, table) if partitioned else None)
+
+        sql = text(f"""
+            SELECT jsonb_build_object(
+                'type', 'Feature',
+                'id', t.fid,
+                'geometry', ST_AsGeoJSON(ST_Transform(t.geom, 4326))::jsonb,
+                'properties', {props_sql}
+            )::text
+            FROM "{schema}"."{table}" t{where}
+        """)
+        with self._db.connect() as conn:
+            result = conn.execution_options(yield_per=batch_size).execute(sql, params)
+            for partition in result.partitions():
+                yield [row[0] for row in partition]
+
+    def export_with_ogr2ogr(
+        self,
+        table: str,
+        schema: str,
+        dest_path: str,
+        driver: str,
+        columns: list[str],
+        bbox: Optional[tuple[float, float, float, float]] = None,
+        filters: Optional[dict[str, str]] = None,
+        layer_options: Optional[list[str]] = None,
+    ) -> None:
+        # Requer GDAL (ogr2ogr) instalado no sistema; grava em arquivo (ex.: FlatGeobuf precisa de seek)
+        conn_str = self._db._url.replace("+psycopg2", "")
+        cmd = [
+            "ogr2ogr",
+            "-f", driver,
+            dest_path,
+            conn_str,
+            f"{schema}.{table}",
+            "-nln", table,
+        ]
+        for opt in layer_options or []:
+            cmd += ["-lco", opt]
+        # `fid` é exposto pelo driver PG como FID da feature, não como campo; seleção sempre
+        # explícita: vazia (só fid pedido) exporta nenhum atributo, nem a chave de partição
+        fields = [c for c in columns if c != "fid"]
+        cmd += ["-select", ",".join(fields)]
+        if bbox is not None:
+            cmd += ["-spat", *(str(v) for v in bbox), "-spat_srs", "EPSG:4326"]
+        if filters:
+            where = " AND ".join(
+                f"{_quote_ident(col)} = '{str(value).replace(chr(39), chr(39) * 2)}'"
+                for col, value in filters.items()
+            )
+            cmd += ["-where", where]
+        proc = subprocess.run(cmd, capture_output=True, text=True)
+        if proc.returncode != 0:
+            raise RuntimeError(f"ogr2ogr (export) falhou: {proc.stderr}")
@@ -0,0 +1,116 @@
+import threading
+import time
+from typing import Optional
+
+
+class CircuitOpenError(Exception):
+    """Dependência marcada como indisponível: a chamada falha na hora, sem esperar timeout."""
+
+    def __init__(self, name: str, retry_after: float):
+        self.name = name
+        self.retry_after = max(0.0, retry_after)
+        super().__init__(f"Serviço '{name}' indisponível (circuit breaker aberto). Tente em {int(self.retry_after) + 1}s.")
+
+
+class CircuitBreaker:
+    """
+    closed -> (N falhas seguidas) -> open -> (reset_timeout) -> half_open
+    half_open: uma chamada de prova; sucesso fecha, falha reabre.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._probe_started_at = 0.0
+        self._last_error: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def _retry_after(self) -> float:
+        return self._opened_at + self.reset_timeout - time.monotonic()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and self._retry_after() <= 0:
+                return self.HALF_OPEN
+            return self._state
+
+    def ensure_available(self) -> None:
+        """Só consulta (não consome a chamada de prova): para rejeitar trabalho caro de antemão."""
+        with self._lock:
+            if self._state == self.OPEN and self._retry_after() > 0:
+                raise CircuitOpenError(self.name, self._retry_after())
+
+    def before_call(self) -> None:
+        with self._lock:
+            if self._state == self.OPEN:
+                if self._retry_after() > 0:
+                    raise CircuitOpenError(self.name, self._retry_after())
+                self._state = self.HALF_OPEN
+                self._probe_in_flight = False
+            if self._state == self.HALF_OPEN:
+                # prova abandonada (ex.: request cancelado) não trava o breaker para sempre
+                if self._probe_in_flight and time.monotonic() - self._probe_started_at < self.reset_timeout:
+                    raise CircuitOpenError(self.name, self.reset_timeout)
+                self._probe_in_flight = True
+                self._probe_started_at = time.monotonic()
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self, error: Optional[BaseException] = None) -> None:
+        with self._lock:
+            self._failures += 1
+            self._last_error = str(error)[:500] if error else None
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._probe_in_flight = False
+
+    def snapshot(self) -> dict:
+        state = self.state
+        with self._lock:
+            return {
+                "name": self.name,
+                "state": state,
+                "consecutive_failures": self._failures,
+                "retry_after_seconds": round(max(0.0, self._retry_after()), 1) if state == self.OPEN else None,
+                "last_error": self._last_error,
+            }
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+_defaults = {"failure_threshold": 5, "reset_timeout": 30.0}
+_registry_lock = threading.Lock()
+
+
+def configure_breakers(failure_threshold: int, reset_timeout: float) -> None:
+    _defaults.update(failure_threshold=failure_threshold, reset_timeout=reset_timeout)
+    with _registry_lock:
+        for b in _breakers.values():
+            b.failure_threshold = max(1, failure_threshold)
+            b.reset_timeout = reset_timeout
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    """Um breaker por dependência e por processo (services são recriados a cada request)."""
+    with _registry_lock:
+        if name not in _breakers:
+            _breakers[name] = CircuitBreaker(name, **_defaults)
+        return _breakers[name]
+
+
+def all_breakers() -> list[dict]:
+    with _registry_lock:
+        breakers = list(_breakers.values())
+    return [b.snapshot() for b in breakers]
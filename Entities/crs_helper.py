@@ -0,0 +1,78 @@
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+# nomes normalizados de PROJCS/GEOGCS (ESRI e OGC) -> EPSG
+# cobre os sistemas usuais nas bases do Ceará/Brasil
+_WKT_NAME_TO_EPSG: dict[str, int] = {
+    # SIRGAS 2000
+    "sirgas_2000": 4674,
+    "sirgas2000": 4674,
+    "sirgas_2000_utm_zone_22s": 31982,
+    "sirgas_2000_utm_zone_23s": 31983,
+    "sirgas_2000_utm_zone_24s": 31984,
+    "sirgas_2000_utm_zone_25s": 31985,
+    "sirgas_2000_polyconic": 5880,
+    "sirgas_2000_brazil_polyconic": 5880,
+    # WGS 84
+    "wgs_1984": 4326,
+    "wgs_84": 4326,
+    "wgs_1984_utm_zone_23s": 32723,
+    "wgs_1984_utm_zone_24s": 32724,
+    "wgs_1984_utm_zone_25s": 32725,
+    "wgs_84_utm_zone_23s": 32723,
+    "wgs_84_utm_zone_24s": 32724,
+    "wgs_84_utm_zone_25s": 32725,
+    "wgs_1984_web_mercator_auxiliary_sphere": 3857,
+    "wgs_84_pseudo_mercator": 3857,
+    # SAD69
+    "south_american_1969": 4618,
+    "sad69": 4618,
+    "sad_1969_utm_zone_23s": 29193,
+    "sad_1969_utm_zone_24s": 29194,
+    "sad_1969_utm_zone_25s": 29195,
+    "sad69_utm_zone_23s": 29193,
+    "sad69_utm_zone_24s": 29194,
+    "sad69_utm_zone_25s": 29195,
+    # Córrego Alegre
+    "corrego_alegre": 4225,
+    "corrego_alegre_1970_72": 4225,
+    "corrego_alegre_utm_zone_24s": 22524,
+}
+
+_ROOT_NAME = re.compile(r'^\s*(PROJCS|GEOGCS|PROJCRS|GEOGCRS)\s*\[\s*"([^"]+)"', re.IGNORECASE)
+# AUTHORITY/ID do sistema raiz: o último elemento antes do colchete final
+_ROOT_AUTHORITY = re.compile(r'(?:AUTHORITY|ID)\s*\[\s*"EPSG"\s*,\s*"?(\d+)"?\s*\]\s*\]\s*$', re.IGNORECASE)
+
+
+def _normalize(name: str) -> str:
+    n = re.sub(r"[^a-z0-9]+", "_", name.strip().lower()).strip("_")
+    return re.sub(r"^gcs_", "", n)
+
+
+@lru_cache(maxsize=512)
+def wkt_to_epsg(wkt: str) -> Optional[int]:
+    """
+    Detecta o EPSG de um .prj (WKT). Usa a AUTHORITY raiz quando existe;
+    senão, o nome do sistema na tabela de equivalências. None = desconhecido.
+    """
+    if not wkt or not wkt.strip():
+        return None
+
+    authority = _ROOT_AUTHORITY.search(wkt)
+    if authority:
+        return int(authority.group(1))
+
+    m = _ROOT_NAME.match(wkt)
+    if m:
+        return _WKT_NAME_TO_EPSG.get(_normalize(m.group(2)))
+    return None
+
+
+def detect_prj_epsg(shp_path: str) -> Optional[int]:
+    """EPSG do .prj ao lado do .shp (mesmo basename), se existir e for reconhecido."""
+    prj = Path(shp_path).with_suffix(".prj")
+    if not prj.exists():
+        return None
+    return wkt_to_epsg(prj.read_text(encoding="latin-1", errors="ignore"))
@@ -0,0 +1,61 @@
+import re
+from typing import Iterable, Optional
+
+# tipos em que BRIN compensa quando a ordem física acompanha o valor (ano, datas, códigos sequenciais)
+_BRIN_TYPES = {
+    "smallint", "integer", "bigint", "numeric", "real", "double precision",
+    "date", "timestamp without time zone", "timestamp with time zone",
+}
+
+_OPERATORS = r"(?:=|<>|!=|<=|>=|<|>|\bIN\b|\bBETWEEN\b|\bI?LIKE\b|\bIS\b|\bANY\b)"
+_WHERE = re.compile(r"\bWHERE\b(.*?)(?:\bORDER\s+BY\b|\bGROUP\s+BY\b|\bLIMIT\b|\bOFFSET\b|$)", re.I | re.S)
+_ORDER_BY = re.compile(r"\bORDER\s+BY\b(.*?)(?:\bLIMIT\b|\bOFFSET\b|\bFOR\b|$)", re.I | re.S)
+
+
+def _table_ref(schema: str, table: str) -> re.Pattern:
+    # GeoServer (datastore PostGIS com schema) sempre qualifica: "zcm"."camada"
+    return re.compile(
+        rf'(?<![\w"])"?{re.escape(schema)}"?\s*\.\s*"?{re.escape(table)}"?(?![\w"])',
+        re.I,
+    )
+
+
+def _column_ref(column: str) -> str:
+    # coluna opcionalmente entre aspas e qualificada (t."cod_mun", "cod_mun", cod_mun)
+    return rf'(?<![\w"])"?{re.escape(column)}"?(?![\w"])'
+
+
+def predicate_columns(query: str, schema: str, table: str, columns: Iterable[str]) -> dict[str, set[str]]:
+    """
+    Colunas da tabela usadas em filtro (WHERE col <op>) ou ordenação (ORDER BY)
+    numa query normalizada do pg_stat_statements. Vazio se a query não cita a tabela.
+    """
+    if not _table_ref(schema, table).search(query):
+        return {}
+
+    where = " ".join(m.group(1) for m in _WHERE.finditer(query))
+    order_by = " ".join(m.group(1) for m in _ORDER_BY.finditer(query))
+
+    found: dict[str, set[str]] = {}
+    for col in columns:
+        ref = _column_ref(col)
+        if where and re.search(ref + r"\s*(?:::\s*\w+\s*)?" + _OPERATORS, where, re.I):
+            found.setdefault(col, set()).add("filter")
+        if order_by and re.search(ref, order_by, re.I):
+            found.setdefault(col, set()).add("sort")
+    return found
+
+
+def choose_index_method(data_type: str, correlation: Optional[float], n_rows: int, brin_min_rows: int) -> str:
+    """
+    BRIN para tabelas grandes com coluna ordenável bem correlacionada com a ordem
+    física (índice minúsculo, varre poucos blocos); B-tree no resto.
+    """
+    if (
+        n_rows >= brin_min_rows
+        and data_type in _BRIN_TYPES
+        and correlation is not None
+        and abs(correlation) >= 0.9
+    ):
+        return "brin"
+    return "btree"
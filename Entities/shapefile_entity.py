@@ -1,7 +1,10 @@
 from dataclasses import dataclass
+from typing import Optional
 
 @dataclass
 class ShapefileEntity:
     name: str
     path: str
     srid: int = 4674
+    # SRID de origem detectado no .prj (None = desconhecido)
+    source_srid: Optional[int] = None
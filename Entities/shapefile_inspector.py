@@ -0,0 +1,176 @@
+import struct
+import zipfile
+from pathlib import Path, PurePosixPath
+from typing import BinaryIO, Optional
+
+from Entities.crs_helper import wkt_to_epsg
+
+SHAPE_TYPES = {
+    0: "Null",
+    1: "Point", 3: "LineString", 5: "Polygon", 8: "MultiPoint",
+    11: "PointZ", 13: "LineStringZ", 15: "PolygonZ", 18: "MultiPointZ",
+    21: "PointM", 23: "LineStringM", 25: "PolygonM", 28: "MultiPointM",
+    31: "MultiPatch",
+}
+
+# Language Driver ID do cabeçalho .dbf -> codec Python (quando não há .cpg)
+_DBF_LDID = {
+    0x01: "cp437", 0x02: "cp850", 0x03: "cp1252", 0x57: "cp1252",
+    0x64: "cp852", 0x65: "cp866", 0x7D: "cp1255", 0x7E: "cp1256",
+    0xC8: "cp1250", 0xC9: "cp1251", 0xCB: "cp1253",
+}
+
+_SHP_HEADER = 100
+_DBF_HEADER = 32
+_DBF_FIELD = 32
+
+
+def parse_shp_header(header: bytes) -> dict:
+    """Cabeçalho de 100 bytes comum a .shp e .shx (big endian no início, little endian depois)."""
+    if len(header) < _SHP_HEADER:
+        raise ValueError("Cabeçalho .shp/.shx incompleto.")
+    file_code, = struct.unpack(">i", header[0:4])
+    if file_code != 9994:
+        raise ValueError("Arquivo não é um shapefile válido (file code != 9994).")
+    file_length_words, = struct.unpack(">i", header[24:28])
+    shape_type, = struct.unpack("<i", header[32:36])
+    xmin, ymin, xmax, ymax = struct.unpack("<4d", header[36:68])
+    return {
+        "file_length": file_length_words * 2,
+        "shape_type": shape_type,
+        "geometry_type": SHAPE_TYPES.get(shape_type, f"Unknown({shape_type})"),
+        "bbox": [xmin, ymin, xmax, ymax],
+    }
+
+
+def feature_count_from_shx(shx_header: dict) -> int:
+    # .shx = cabeçalho + 8 bytes (offset, tamanho) por registro
+    return max(0, (shx_header["file_length"] - _SHP_HEADER) // 8)
+
+
+def shapefile_feature_count(shp_path: str) -> Optional[int]:
+    """Nº de feições pelo cabeçalho do .shx ao lado do .shp (None se não houver .shx)."""
+    shx = Path(shp_path).with_suffix(".shx")
+    if not shx.exists():
+        return None
+    with shx.open("rb") as f:
+        return feature_count_from_shx(parse_shp_header(f.read(_SHP_HEADER)))
+
+
+def read_dbf_header(f: BinaryIO) -> dict:
+    head = f.read(_DBF_HEADER)
+    if len(head) < _DBF_HEADER:
+        raise ValueError("Cabeçalho .dbf incompleto.")
+    record_count, header_length, record_length = struct.unpack("<IHH", head[4:12])
+    ldid = head[29]
+
+    fields = []
+    descriptors = f.read(max(0, header_length - _DBF_HEADER))
+    for i in range(0, len(descriptors) - _DBF_FIELD + 1, _DBF_FIELD):
+        d = descriptors[i:i + _DBF_FIELD]
+        if d[0] == 0x0D:  # terminador
+            break
+        fields.append({
+            "name": d[0:11].split(b"\x00", 1)[0].decode("latin-1").strip(),
+            "type": chr(d[11]),
+            "length": d[16],
+            "decimals": d[17],
+        })
+
+    return {
+        "record_count": record_count,
+        "record_length": record_length,
+        "ldid": ldid,
+        "encoding": _DBF_LDID.get(ldid),
+        "fields": fields,
+    }
+
+
+def _members_by_stem(zf: zipfile.ZipFile) -> dict[str, dict[str, zipfile.ZipInfo]]:
+    groups: dict[str, dict[str, zipfile.ZipInfo]] = {}
+    for info in zf.infolist():
+        if info.is_dir() or PurePosixPath(info.filename).name.startswith("."):
+            continue
+        p = PurePosixPath(info.filename.lower())
+        groups.setdefault(str(p.with_suffix("")), {})[p.suffix] = info
+    return groups
+
+
+def inspect_shapefile_zip(
+    source: BinaryIO | str,
+    features_per_second: float = 20000.0,
+    max_fields: int = 100,
+) -> dict:
+    """
+    Inspeção rápida do ZIP: lê só o diretório central e os cabeçalhos
+    (.shp/.shx/.dbf) e o .prj — nada de geometria ou registros.
+    """
+    layers, warnings = [], []
+
+    with zipfile.ZipFile(source) as zf:
+        groups = _members_by_stem(zf)
+
+        for stem, members in sorted(groups.items()):
+            if ".shp" not in members:
+                continue
+            name = PurePosixPath(stem).name
+            layer: dict = {"name": name, "path": members[".shp"].filename}
+
+            with zf.open(members[".shp"]) as f:
+                shp = parse_shp_header(f.read(_SHP_HEADER))
+            layer.update({"geometry_type": shp["geometry_type"], "bbox": shp["bbox"]})
+
+            if ".shx" in members:
+                with zf.open(members[".shx"]) as f:
+                    layer["feature_count"] = feature_count_from_shx(parse_shp_header(f.read(_SHP_HEADER)))
+            else:
+                layer["feature_count"] = None
+                warnings.append(f"{name}: .shx ausente.")
+
+            if ".dbf" in members:
+                with zf.open(members[".dbf"]) as f:
+                    dbf = read_dbf_header(f)
+                layer["fields"] = dbf["fields"]
+                layer["encoding"] = dbf["encoding"]
+                if layer["feature_count"] is None:
+                    layer["feature_count"] = dbf["record_count"]
+                elif dbf["record_count"] != layer["feature_count"]:
+                    warnings.append(f"{name}: .dbf ({dbf['record_count']}) e .shx ({layer['feature_count']}) com contagens diferentes.")
+                if len(dbf["fields"]) > max_fields:
+                    warnings.append(f"{name}: {len(dbf['fields'])} atributos (limite recomendado: {max_fields}).")
+            else:
+                layer["fields"] = []
+                layer["encoding"] = None
+                warnings.append(f"{name}: .dbf ausente.")
+
+            if ".cpg" in members:
+                layer["encoding"] = zf.read(members[".cpg"]).decode("ascii", errors="ignore").strip() or layer["encoding"]
+            if not layer["encoding"]:
+                warnings.append(f"{name}: codificação não declarada (.cpg ausente e LDID vazio).")
+
+            if ".prj" in members:
+                wkt = zf.read(members[".prj"]).decode("latin-1", errors="ignore")
+                layer["prj_wkt"] = wkt
+                layer["epsg"] = wkt_to_epsg(wkt)
+                if layer["epsg"] is None:
+                    warnings.append(f"{name}: sistema de referência do .prj não reconhecido.")
+            else:
+                layer["prj_wkt"] = None
+                layer["epsg"] = None
+                warnings.append(f"{name}: .prj ausente — SRID de origem desconhecido.")
+
+            size = members[".shp"].file_size + (members[".dbf"].file_size if ".dbf" in members else 0)
+            count = layer["feature_count"] or 0
+            layer["estimated_import"] = {
+                "bytes": size,
+                "seconds": round(count / features_per_second, 2) if features_per_second > 0 else None,
+            }
+            layers.append(layer)
+
+    if not layers:
+        warnings.append("ZIP não contém .shp")
+    types = {l["geometry_type"] for l in layers}
+    if len(types) > 1:
+        warnings.append(f"Tipos de geometria diferentes no ZIP: {', '.join(sorted(types))}.")
+
+    return {"layers": layers, "warnings": warnings}
@@ -2,11 +2,12 @@
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel, EmailStr
 import jwt  # PyJWT
 
 from Presentation.API.settings import settings
+from Presentation.API.security import get_token_verifier, require_token
 
 router = APIRouter()
 
@@ -25,7 +26,7 @@ JWT_SECRET: str = getattr(settings, "JWT_SECRET", "fauno_dev_secret_change_me")
 JWT_ISSUER: str = getattr(settings, "JWT_ISSUER", "Fauno")
 JWT_AUDIENCE: str = getattr(settings, "JWT_AUDIENCE", "FaunoClient")
 JWT_EXPIRES_MINUTES: int = getattr(settings, "JWT_EXPIRES_MINUTES", 120)
-JWT_ALG: str = "HS256"
+JWT_ALG: str = getattr(settings, "JWT_ALGORITHM", "HS256")
 
 # ---- endpoint ----
 @router.post("/login", response_model=TokenResponse)
@@ -52,3 +53,9 @@ def login(body: LoginRequest) -> TokenResponse:
         access_token=token,
         expires_in=JWT_EXPIRES_MINUTES * 60,
     )
+
+
+@router.get("/token-cache", dependencies=[Depends(require_token)])
+def token_cache_stats() -> dict:
+    """Latência da verificação de JWT e taxa de acerto do cache de tokens verificados."""
+    return get_token_verifier().stats()
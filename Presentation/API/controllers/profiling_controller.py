@@ -0,0 +1,26 @@
+# Presentation/API/controllers/profiling_controller.py
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import FileResponse
+
+from Application.services.profiling_service import ProfilingService
+from Presentation.API.security import require_admin
+from Presentation.API.settings import settings
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+
+@router.get("")
+def list_profiles():
+    """Sessões de profiling gravadas (mais recentes primeiro), com seções e arquivos."""
+    service = ProfilingService.create_from_settings(settings)
+    return {"enabled": service.enabled, "profiles": service.list_profiles()}
+
+
+@router.get("/{profile_id}/{filename}")
+def download_profile_file(profile_id: str, filename: str):
+    """Baixa um .pstats (abrir com `python -m pstats` ou snakeviz), .txt ou -alloc.txt."""
+    path = ProfilingService.create_from_settings(settings).resolve_file(profile_id, filename)
+    if path is None:
+        raise HTTPException(status_code=404, detail=f"Arquivo '{filename}' não encontrado no profile '{profile_id}'.")
+    media_type = "application/octet-stream" if path.suffix == ".pstats" else "text/plain; charset=utf-8"
+    return FileResponse(path, media_type=media_type, filename=path.name)
@@ -1,5 +1,6 @@
 import os
 import shutil
+import zipfile
 import tempfile
 from pathlib import Path
 from typing import Dict
@@ -7,25 +8,75 @@ import requests
 import traceback
 
 
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Depends, UploadFile, File, Form, Header, HTTPException, Request, Response, Query
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 
 from Application.services.shapefile_service import ShapefileService
-from Application.dto.shapefile_dto import ShapefileUploadResultDTO
+from Application.services.tile_service import TileService
+from Application.services.export_service import ExportService, EXPORT_FORMATS
+from Application.services.reconcile_service import ReconcileService
+from Application.services.inspect_service import InspectService, save_and_sha256
+from Application.services.profiling_service import ProfilingService
+from Application.services.index_advisor_service import IndexAdvisorService
+from Application.helpers.streaming import gzip_stream
+from Application.dto.shapefile_dto import ShapefileUploadResultDTO, ReconcileReportDTO, ShapefileInspectionDTO
 from Application.mappings.shapefile_mapper import to_entity
 from Entities.geoserver_helper import sanitize_layer_name
 from Presentation.API.settings import settings
-from Application.helpers.exceptions import GeoServerError
+from Application.helpers.exceptions import GeoServerError, LayerNotFoundError, CircuitOpenError
+from Application.services.health_service import get_health_monitor
+from Presentation.API.security import require_admin, require_token
 
 router = APIRouter()
 
+# rotas que exigem Bearer JWT (health fica aberto para o orquestrador)
+_protected = [Depends(require_token)]
+
 @router.post("/upload", response_model=ShapefileUploadResultDTO)
 async def upload_and_publish(
+    response: Response,
     file: UploadFile = File(..., description="ZIP contendo .shp, .dbf, .shx, .prj"),
     workspace: str = Form(default=None),
     datastore: str = Form(default=None),
     srid: int = Form(default=4674),
     publishOnINDE: str | None = Form(default=None),
+    parallelism: int | None = Form(default=None, ge=1, le=64),
+    profile: bool = Header(default=False, alias="X-Fauno-Profile"),
+    claims: dict = Depends(require_token),
+) -> ShapefileUploadResultDTO:
+    # profiling sob demanda: pedido explícito só para admin; amostragem vale para todos
+    if profile and "admin" not in (claims.get("roles") or []):
+        raise HTTPException(status_code=403, detail="Profiling restrito a administradores.")
+
+    profiling = ProfilingService.create_from_settings(settings)
+    trigger = profiling.trigger_for(requested=profile)
+    if trigger is None:
+        return await _upload_and_publish(file, workspace, datastore, srid, publishOnINDE, parallelism)
+
+    with profiling.session("upload_and_publish", trigger) as session:
+        if session is None:
+            return await _upload_and_publish(file, workspace, datastore, srid, publishOnINDE, parallelism)
+        # o id do profile precisa chegar também nas respostas de erro (é quando mais interessa)
+        profile_header = {"X-Fauno-Profile-Id": session.id}
+        response.headers.update(profile_header)
+        try:
+            result = await _upload_and_publish(file, workspace, datastore, srid, publishOnINDE, parallelism)
+        except HTTPException as he:
+            he.headers = {**(he.headers or {}), **profile_header}
+            raise
+        if isinstance(result, Response):
+            result.headers.update(profile_header)
+        return result
+
+
+async def _upload_and_publish(
+    file: UploadFile,
+    workspace: str | None,
+    datastore: str | None,
+    srid: int,
+    publishOnINDE: str | None,
+    parallelism: int | None,
 ) -> ShapefileUploadResultDTO:
     if not file.filename.lower().endswith(".zip"):
         return JSONResponse(status_code=400, content={
@@ -37,17 +88,27 @@ async def upload_and_publish(
     ws = workspace or settings.GEOSERVER_WORKSPACE
     ds = datastore or settings.GEOSERVER_DATASTORE
 
+    # destino indisponível (breaker aberto): rejeita antes do import caro
+    service = ShapefileService.create_from_settings(settings)
+    service.ensure_targets_available()
+
     # salvar zip em diretório temporário
     tmp_root = Path(settings.UPLOAD_TEMP_PATH or tempfile.gettempdir()) / "fauno"
     tmp_root.mkdir(parents=True, exist_ok=True)
     tmp_dir = Path(tempfile.mkdtemp(prefix="fauno_", dir=tmp_root))
 
     zip_path = tmp_dir / file.filename
-    with zip_path.open("wb") as f:
-        f.write(await file.read())
+    # gravação + SHA-256 numa passada, fora do event loop (ZIPs de centenas de MB)
+    archive_sha256 = await run_in_threadpool(save_and_sha256, file.file, zip_path)
 
-    # extrair
-    shutil.unpack_archive(str(zip_path), str(tmp_dir))
+    # reaproveita a inspeção prévia (/inspect) do mesmo arquivo, se houver
+    inspection = InspectService.create_from_settings(settings).get_cached(archive_sha256)
+    if inspection is not None and not inspection["layers"]:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise HTTPException(status_code=400, detail="ZIP não contém .shp")
+
+    # extrair (fora do event loop: ZIPs grandes levam segundos)
+    await run_in_threadpool(shutil.unpack_archive, str(zip_path), str(tmp_dir))
 
     # converter todos os nomes de arquivos para minúsculo
     for item in tmp_dir.iterdir():
@@ -71,18 +132,22 @@ async def upload_and_publish(
         sld_xml = sld_path.read_text(encoding="utf-8", errors="ignore")
 
     # montar entidade + service
-    shapefile_entity = to_entity(name=layer_name, path=str(shp_path), srid=srid)
-    service = ShapefileService.create_from_settings(settings)
+    # SRID de origem já detectado na inspeção prévia (senão o service lê o .prj)
+    source_srid = None
+    if inspection is not None:
+        source_srid = next((l["epsg"] for l in inspection["layers"] if l["name"] == shp_path.stem), None)
+
+    shapefile_entity = to_entity(name=layer_name, path=str(shp_path), srid=srid, source_srid=source_srid)
 
     # importar para PostGIS e publicar no GeoServer
     try:
-        service.import_to_postgis(shapefile_entity)
+        import_report = await service.import_to_postgis_async(shapefile_entity, parallelism=parallelism)
 
         publish_on_inde = False
         if publishOnINDE is not None:
             publish_on_inde = str(publishOnINDE).strip().lower() in ("1", "true", "yes", "on")
 
-        pub = service.publish_on_geoserver(
+        pub = await service.publish_on_geoserver_async(
             shapefile_entity,
             workspace=ws,
             datastore=ds,
@@ -99,6 +164,7 @@ async def upload_and_publish(
             database_table=layer_name,
             status="Publicado com sucesso no GeoServer",
             geoserver=pub,
+            import_report=import_report,
         )
 
     except GeoServerError as ge:
@@ -112,6 +178,14 @@ async def upload_and_publish(
             "response_text": ge.response_text
         })
 
+    except CircuitOpenError as ce:
+        return JSONResponse(status_code=503, headers={"Retry-After": str(int(ce.retry_after) + 1)}, content={
+            "error": "ServiceUnavailable",
+            "message": str(ce),
+            "detail": None,
+            "service": ce.name,
+        })
+
     except requests.HTTPError as he:
         resp = he.response
         return JSONResponse(status_code=502, content={
@@ -131,15 +205,43 @@ async def upload_and_publish(
         })
 
     finally:
-        shutil.rmtree(tmp_dir, ignore_errors=True)
+        await run_in_threadpool(shutil.rmtree, tmp_dir, ignore_errors=True)
 
 
 
+@router.post("/inspect", response_model=ShapefileInspectionDTO, dependencies=_protected)
+def inspect_shapefile(
+    file: UploadFile = File(..., description="ZIP contendo .shp, .dbf, .shx, .prj"),
+    srid: int | None = Form(default=None),
+) -> ShapefileInspectionDTO:
+    """
+    Inspeção rápida do ZIP (só cabeçalhos e .prj), antes do upload completo.
+    """
+    if not file.filename.lower().endswith(".zip"):
+        raise HTTPException(status_code=400, detail="Envie um arquivo .zip com o shapefile.")
+
+    service = InspectService.create_from_settings(settings)
+    try:
+        result = service.inspect(file.file, expected_srid=srid)
+    except (zipfile.BadZipFile, ValueError) as ex:
+        raise HTTPException(status_code=400, detail=f"ZIP inválido: {ex}")
+    return ShapefileInspectionDTO(**result)
+
+
 @router.get("/health")
 def health() -> Dict[str, str]:
     return {"status": "ok"}
 
-@router.get("/layers")
+@router.get("/health/deep")
+def health_deep():
+    """
+    Alcance e latência do PostGIS (pool) e do REST do GeoServer, em cache,
+    mais o estado dos circuit breakers. 503 quando algo está fora.
+    """
+    report = get_health_monitor(settings).snapshot()
+    return JSONResponse(status_code=200 if report["status"] == "ok" else 503, content=report)
+
+@router.get("/layers", dependencies=_protected)
 def list_layers():
     """
     Lista todas as camadas do schema configurado no GeoServer Workspace.
@@ -149,4 +251,162 @@ def list_layers():
         layers = service.list_layers()
         return JSONResponse(content=layers)
     except Exception as ex:
-        raise HTTPException(status_code=500, detail=f"Erro ao listar layers: {ex}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Erro ao listar layers: {ex}")
+
+@router.get("/layers/{name}/partitions", dependencies=_protected)
+def list_layer_partitions(name: str):
+    """Partições (célula, feições e extent) de uma layer em armazenamento particionado."""
+    service = ShapefileService.create_from_settings(settings)
+    return {"layer": name, "partitions": service.list_partitions(name)}
+
+@router.put("/layers/{name}/partitions/{cell}", dependencies=_protected)
+def reload_layer_partition(
+    name: str,
+    cell: str,
+    file: UploadFile = File(..., description="ZIP com o shapefile das feições da célula"),
+):
+    """Recarrega só a partição `cell` da layer; as demais partições não são tocadas."""
+    if not file.filename.lower().endswith(".zip"):
+        raise HTTPException(status_code=400, detail="Envie um arquivo .zip com o shapefile.")
+
+    tmp_root = Path(settings.UPLOAD_TEMP_PATH or tempfile.gettempdir()) / "fauno"
+    tmp_root.mkdir(parents=True, exist_ok=True)
+    tmp_dir = Path(tempfile.mkdtemp(prefix="fauno_", dir=tmp_root))
+    try:
+        zip_path = tmp_dir / "partition.zip"
+        with zip_path.open("wb") as out:
+            shutil.copyfileobj(file.file, out, 1024 * 1024)
+        shutil.unpack_archive(str(zip_path), str(tmp_dir))
+        shp_files = sorted(p for p in tmp_dir.iterdir() if p.suffix.lower() == ".shp")
+        if not shp_files:
+            raise HTTPException(status_code=400, detail="ZIP não contém .shp")
+
+        service = ShapefileService.create_from_settings(settings)
+        report = service.reload_partition(name, cell, str(shp_files[0]))
+    except LayerNotFoundError as ex:
+        raise HTTPException(status_code=404, detail=str(ex))
+    except (zipfile.BadZipFile, shutil.ReadError, ValueError) as ex:
+        raise HTTPException(status_code=400, detail=str(ex))
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    return {"layer": name, **report}
+
+
+@router.get("/layers/{name}/tiles/{z}/{x}/{y}.mvt", dependencies=_protected)
+def get_layer_tile(
+    name: str,
+    z: int,
+    x: int,
+    y: int,
+    request: Request,
+    fields: str | None = Query(default=None, description="Atributos separados por vírgula"),
+):
+    """
+    Tile Mapbox Vector Tile (EPSG:3857) gerado direto do PostGIS, com cache LRU + disco.
+    """
+    if sanitize_layer_name(name) != name:
+        raise HTTPException(status_code=400, detail=f"Nome de layer inválido: {name}")
+
+    field_list = [f.strip() for f in fields.split(",") if f.strip()] if fields else None
+
+    try:
+        service = TileService.create_from_settings(settings)
+        tile, etag = service.get_tile(name, z, x, y, fields=field_list)
+    except LayerNotFoundError as ex:
+        raise HTTPException(status_code=404, detail=str(ex))
+    except ValueError as ex:
+        raise HTTPException(status_code=400, detail=str(ex))
+
+    headers = {
+        "ETag": etag,
+        # rota autenticada: só o cache do próprio cliente pode guardar o tile
+        "Cache-Control": f"private, max-age={settings.TILES_MAX_AGE}",
+        "Vary": "Authorization",
+    }
+    if etag in (request.headers.get("if-none-match") or ""):
+        return Response(status_code=304, headers=headers)
+    return Response(content=tile, media_type="application/vnd.mapbox-vector-tile", headers=headers)
+
+@router.get("/layers/{name}/export", dependencies=_protected)
+def export_layer(
+    name: str,
+    request: Request,
+    format: str = Query(default="geojson", description="geojson | ndjson | fgb"),
+    bbox: str | None = Query(default=None, description="xmin,ymin,xmax,ymax em EPSG:4326"),
+    fields: str | None = Query(default=None, description="Atributos separados por vírgula"),
+    filter: list[str] | None = Query(default=None, description="Filtro de igualdade campo:valor (repetível)"),
+):
+    """
+    Exporta a layer em streaming (cursor no servidor, lotes de tamanho fixo),
+    com gzip sob demanda quando o cliente aceita.
+    """
+    if sanitize_layer_name(name) != name:
+        raise HTTPException(status_code=400, detail=f"Nome de layer inválido: {name}")
+
+    bbox_values = None
+    if bbox:
+        try:
+            bbox_values = tuple(float(v) for v in bbox.split(","))
+        except ValueError:
+            bbox_values = ()
+        if len(bbox_values) != 4:
+            raise HTTPException(status_code=400, detail="bbox deve ser xmin,ymin,xmax,ymax")
+
+    filters: dict[str, str] = {}
+    for item in filter or []:
+        col, sep, value = item.partition(":")
+        if not sep or not col.strip():
+            raise HTTPException(status_code=400, detail=f"Filtro inválido (use campo:valor): {item}")
+        filters[col.strip()] = value
+
+    field_list = [f.strip() for f in fields.split(",") if f.strip()] if fields else None
+
+    try:
+        service = ExportService.create_from_settings(settings)
+        body = service.export_layer(name, fmt=format, fields=field_list, bbox=bbox_values, filters=filters or None)
+    except LayerNotFoundError as ex:
+        raise HTTPException(status_code=404, detail=str(ex))
+    except ValueError as ex:
+        raise HTTPException(status_code=400, detail=str(ex))
+
+    media_type, ext = EXPORT_FORMATS[format]
+    # o corpo depende do Accept-Encoding: intermediários não podem trocar gzip por texto puro
+    headers = {"Content-Disposition": f'attachment; filename="{name}.{ext}"', "Vary": "Accept-Encoding"}
+    if "gzip" in (request.headers.get("accept-encoding") or "").lower():
+        body = gzip_stream(body)
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(body, media_type=media_type, headers=headers)
+
+@router.post("/reconcile", response_model=ReconcileReportDTO, dependencies=_protected)
+def reconcile_geoserver(
+    workspace: str | None = Query(default=None),
+    datastore: str | None = Query(default=None),
+    dry_run: bool = Query(default=True, description="Apenas relata o diff, sem alterar o GeoServer"),
+    max_workers: int | None = Query(default=None, ge=1, le=32),
+) -> ReconcileReportDTO:
+    """
+    Republica no GeoServer, em lote, as tabelas do schema que estão faltando ou divergentes.
+    """
+    service = ReconcileService.create_from_settings(settings)
+    report = service.reconcile(
+        workspace=workspace or settings.GEOSERVER_WORKSPACE,
+        datastore=datastore or settings.GEOSERVER_DATASTORE,
+        dry_run=dry_run,
+        max_workers=max_workers,
+    )
+    return ReconcileReportDTO(**report)
+
+
+@router.get("/indexes/advice", dependencies=_protected)
+def advise_indexes(table: str | None = Query(default=None, description="Restringe a uma tabela")):
+    """
+    Índices de atributo sugeridos a partir do pg_stat_statements / pg_stat_user_tables
+    (colunas que o GeoServer filtra/ordena em tabelas grandes com seq scan).
+    """
+    return IndexAdvisorService.create_from_settings(settings).advise(table=table)
+
+
+@router.post("/indexes/apply", dependencies=[Depends(require_admin)])
+def apply_indexes(table: str | None = Query(default=None, description="Restringe a uma tabela")):
+    """Cria (CREATE INDEX CONCURRENTLY) os índices sugeridos; reaplicados a cada reimport da layer."""
+    return IndexAdvisorService.create_from_settings(settings).run(table=table, apply=True)
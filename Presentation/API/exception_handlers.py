@@ -5,7 +5,7 @@ from fastapi import HTTPException
 import requests
 
 from Presentation.API.error_response import make_error_response
-from Application.helpers.exceptions import GeoServerError
+from Application.helpers.exceptions import GeoServerError, CircuitOpenError
 
 def register_exception_handlers(app: FastAPI) -> None:
     @app.exception_handler(HTTPException)
@@ -13,13 +13,17 @@ def register_exception_handlers(app: FastAPI) -> None:
         # detail do HTTPException pode ser str ou dict — normalizamos
         msg = exc.detail if isinstance(exc.detail, str) else "Erro HTTP na aplicação."
         extra = exc.detail if isinstance(exc.detail, dict) else None
-        return make_error_response(
+        resp = make_error_response(
             status_code=exc.status_code,
             error="HTTPException",
             message=str(msg),
             exc=exc,
             extra=extra,
         )
+        # ex.: WWW-Authenticate no 401 da verificação de token
+        if exc.headers:
+            resp.headers.update(exc.headers)
+        return resp
 
     @app.exception_handler(RequestValidationError)
     async def validation_exception_handler(request: Request, exc: RequestValidationError):
@@ -46,6 +50,17 @@ def register_exception_handlers(app: FastAPI) -> None:
             },
         )
 
+    @app.exception_handler(CircuitOpenError)
+    async def circuit_open_exception_handler(request: Request, exc: CircuitOpenError):
+        resp = make_error_response(
+            status_code=503,  # dependência indisponível: falha rápida
+            error="ServiceUnavailable",
+            message=str(exc),
+            extra={"service": exc.name, "retry_after_seconds": round(exc.retry_after, 1)},
+        )
+        resp.headers["Retry-After"] = str(int(exc.retry_after) + 1)
+        return resp
+
     @app.exception_handler(requests.HTTPError)
     async def requests_http_error_handler(request: Request, exc: requests.HTTPError):
         resp = exc.response
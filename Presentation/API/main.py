@@ -8,17 +8,45 @@
 # source .venv/bin/activate && uvicorn Presentation.API.main:app --host 0.0.0.0 --port 9090 --reload
 
 import os
+import asyncio
+from contextlib import asynccontextmanager
+
 import uvicorn
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from Presentation.API.settings import settings
+from Data.db_executor import configure_db_executor
+from Entities.circuit_breaker import configure_breakers
+from Application.services.health_service import get_health_monitor
+from Application.services.index_advisor_service import run_advisor_forever
+from Application.services.async_geoserver_service import close_async_client
 from Presentation.API.exception_handlers import register_exception_handlers
 from Presentation.API.controllers.shapefile_controller import router as shapefile_router
 from Presentation.API.controllers.auth_controller import router as auth_router
+from Presentation.API.controllers.profiling_controller import router as profiling_router
+
+
+configure_db_executor(settings.DB_EXECUTOR_WORKERS)
+configure_breakers(settings.BREAKER_FAILURE_THRESHOLD, settings.BREAKER_RESET_SECONDS)
 
 
-app = FastAPI(title=settings.API_TITLE, version=settings.API_VERSION)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # health check profundo atualizado em segundo plano (o /health/deep só lê o cache)
+    tasks = [asyncio.create_task(get_health_monitor(settings).run_forever())]
+    # índices automáticos só com opt-in explícito
+    if settings.INDEX_ADVISOR_AUTO_CREATE:
+        tasks.append(asyncio.create_task(run_advisor_forever(settings)))
+    try:
+        yield
+    finally:
+        for task in tasks:
+            task.cancel()
+        await close_async_client()
+
+
+app = FastAPI(title=settings.API_TITLE, version=settings.API_VERSION, lifespan=lifespan)
 register_exception_handlers(app)
 
 # CORS a partir do settings
@@ -39,6 +67,8 @@ app.include_router(
 
 app.include_router(auth_router, prefix=f"{settings.API_PREFIX}/auth", tags=["Auth"])
 
+app.include_router(profiling_router, prefix=f"{settings.API_PREFIX}/profiles", tags=["Profiling"])
+
 
 if __name__ == "__main__":
     env = os.getenv("ENVIRONMENT", "dev").lower()
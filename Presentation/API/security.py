@@ -0,0 +1,152 @@
+# Presentation/API/security.py
+import hashlib
+import threading
+import time
+from typing import Optional, Sequence
+
+import jwt  # PyJWT
+from fastapi import Depends, HTTPException
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+
+from Application.helpers.lru_cache import LruCache
+from Presentation.API.settings import settings
+
+
+class TokenVerifier:
+    """
+    Verifica JWT (assinatura + iss/aud/exp) e guarda os claims já verificados
+    num LRU limitado, chaveado pelo hash do token. A entrada vale até o `exp`
+    do próprio token: o polling do SPA não repete a verificação a cada request.
+    """
+
+    def __init__(
+        self,
+        secret: str,
+        issuer: str,
+        audience: str,
+        algorithms: Sequence[str] = ("HS256",),
+        cache_max_items: int = 1024,
+    ):
+        self._secret = secret
+        self._issuer = issuer
+        self._audience = audience
+        self._algorithms = list(algorithms)
+        self._cache = LruCache(max_items=cache_max_items)
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._expired = 0
+        self._failures = 0
+        self._verifications = 0
+        self._verify_total_ms = 0.0
+        self._verify_max_ms = 0.0
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        # não mantém o token em claro na memória do cache
+        return hashlib.sha256(token.encode("utf-8")).digest()
+
+    def verify(self, token: str) -> dict:
+        """Retorna os claims; erros de jwt (expirado, assinatura, iss/aud) propagam."""
+        key = self._key(token)
+        cached = self._cache.get(key)
+        if cached is not None:
+            claims, expires_at = cached
+            if expires_at > time.time():
+                with self._lock:
+                    self._hits += 1
+                return claims
+            # expirou depois de entrar no cache: sai e segue para a verificação (que vai falhar)
+            self._cache.pop(key)
+            with self._lock:
+                self._expired += 1
+
+        started = time.perf_counter()
+        try:
+            claims = jwt.decode(
+                token,
+                self._secret,
+                algorithms=self._algorithms,
+                issuer=self._issuer,
+                audience=self._audience,
+                options={"require": ["exp", "iss", "aud"]},
+            )
+        except jwt.PyJWTError:
+            with self._lock:
+                self._failures += 1
+            raise
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            with self._lock:
+                self._misses += 1
+                self._verifications += 1
+                self._verify_total_ms += elapsed_ms
+                self._verify_max_ms = max(self._verify_max_ms, elapsed_ms)
+
+        self._cache.put(key, (claims, float(claims["exp"])))
+        return claims
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                "cache_items": len(self._cache),
+                "cache_max_items": self._cache.stats()["max_items"],
+                "hits": self._hits,
+                "misses": self._misses,
+                "expired_evictions": self._expired,
+                "hit_rate": round(self._hits / total, 4) if total else None,
+                "verifications": self._verifications,
+                "failures": self._failures,
+                "verify_avg_ms": round(self._verify_total_ms / self._verifications, 3) if self._verifications else None,
+                "verify_max_ms": round(self._verify_max_ms, 3),
+            }
+
+
+_verifier: Optional[TokenVerifier] = None
+_verifier_lock = threading.Lock()
+
+
+def get_token_verifier() -> TokenVerifier:
+    global _verifier
+    with _verifier_lock:
+        if _verifier is None:
+            _verifier = TokenVerifier(
+                secret=settings.JWT_SECRET,
+                issuer=settings.JWT_ISSUER,
+                audience=settings.JWT_AUDIENCE,
+                algorithms=[settings.JWT_ALGORITHM],
+                cache_max_items=settings.AUTH_TOKEN_CACHE_MAX_ITEMS,
+            )
+        return _verifier
+
+
+_bearer = HTTPBearer(auto_error=False)
+
+
+def _unauthorized(message: str) -> HTTPException:
+    return HTTPException(status_code=401, detail=message, headers={"WWW-Authenticate": "Bearer"})
+
+
+async def require_token(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(_bearer),
+) -> dict:
+    """
+    Dependência das rotas protegidas: exige `Authorization: Bearer <jwt>` válido
+    e devolve os claims. Async de propósito: o hit de cache não passa pelo threadpool.
+    """
+    if credentials is None or not credentials.credentials:
+        raise _unauthorized("Token de acesso ausente.")
+    try:
+        return get_token_verifier().verify(credentials.credentials)
+    except jwt.ExpiredSignatureError:
+        raise _unauthorized("Token expirado.")
+    except jwt.PyJWTError:
+        raise _unauthorized("Token inválido.")
+
+
+async def require_admin(claims: dict = Depends(require_token)) -> dict:
+    """Rotas administrativas: além do token válido, exige o papel `admin`."""
+    if "admin" not in (claims.get("roles") or []):
+        raise HTTPException(status_code=403, detail="Acesso restrito a administradores.")
+    return claims
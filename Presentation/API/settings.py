@@ -11,6 +11,7 @@ class _Settings(BaseModel):
     DB_USER: str
     DB_PASSWORD: str
     DB_NAME: str
+    DB_EXECUTOR_WORKERS: int = 4
 
     # GeoServer
     GEOSERVER_BASEURL: str
@@ -22,9 +23,69 @@ class _Settings(BaseModel):
     INDE_WORKSPACE: str | None = "inde"
     INDE_DATASTORE: str | None = "inde_ds"
 
+    # Resiliência / health check
+    BREAKER_FAILURE_THRESHOLD: int = 5
+    BREAKER_RESET_SECONDS: float = 30.0
+    HEALTH_REFRESH_SECONDS: float = 15.0
+
+    # Auth (JWT)
+    JWT_SECRET: str = "fauno_dev_secret_change_me"
+    JWT_ISSUER: str = "Fauno"
+    JWT_AUDIENCE: str = "FaunoClient"
+    JWT_EXPIRES_MINUTES: int = 120
+    JWT_ALGORITHM: str = "HS256"
+    AUTH_TOKEN_CACHE_MAX_ITEMS: int = 1024
+
     # Upload
     UPLOAD_TEMP_PATH: Optional[str] = None
 
+    # Profiling sob demanda (upload/import/publish)
+    PROFILING_ENABLED: bool = False
+    PROFILING_SAMPLE_RATE: float = 0.0
+    PROFILING_PATH: Optional[str] = None
+    PROFILING_RETENTION: int = 50
+    PROFILING_TOP_ALLOCATIONS: int = 25
+
+    # Importação
+    IMPORT_REPROJECT_SECONDS_PER_MB: float = 0.05
+    IMPORT_PARALLELISM: int = 1
+    IMPORT_PARALLEL_MIN_FEATURES: int = 500000
+
+    # Armazenamento particionado (layers grandes)
+    PARTITION_ENABLED: bool = False
+    PARTITION_MIN_FEATURES: int = 2000000
+    PARTITION_GRID_SIZE: float = 0.5
+    PARTITION_COLUMN: Optional[str] = None
+    PARTITION_MAX_PARTITIONS: int = 256
+
+    # Inspeção prévia de ZIP
+    INSPECT_CACHE_MAX_ITEMS: int = 256
+    INSPECT_FEATURES_PER_SECOND: float = 20000.0
+    INSPECT_MAX_FIELDS: int = 100
+
+    # Tiles (MVT)
+    TILES_CACHE_PATH: Optional[str] = None
+    TILES_CACHE_MAX_ITEMS: int = 2048
+    TILES_EXTENT: int = 4096
+    TILES_BUFFER: int = 64
+    TILES_SIMPLIFY_PIXELS: float = 1.0
+    TILES_SIMPLIFY_MAX_ZOOM: int = 14
+    TILES_ATTRIBUTES_MIN_ZOOM: int = 10
+    TILES_MAX_AGE: int = 300
+
+    # Export
+    EXPORT_BATCH_SIZE: int = 5000
+
+    # Reconciliação GeoServer
+    RECONCILE_MAX_WORKERS: int = 4
+
+    # Index advisor (índices de atributo)
+    INDEX_ADVISOR_AUTO_CREATE: bool = False
+    INDEX_ADVISOR_INTERVAL_SECONDS: float = 3600.0
+    INDEX_ADVISOR_MIN_CALLS: int = 50
+    INDEX_ADVISOR_MIN_ROWS: int = 100000
+    INDEX_ADVISOR_BRIN_MIN_ROWS: int = 1000000
+
     # API
     API_TITLE: str = Field(default="Fauno API")
     API_VERSION: str = Field(default="1.0.0")
@@ -63,6 +124,7 @@ settings = _Settings(
     DB_USER=_cfg["Database"]["User"],
     DB_PASSWORD=_cfg["Database"]["Password"],
     DB_NAME=_cfg["Database"]["Name"],
+    DB_EXECUTOR_WORKERS=int(_get("Database.ExecutorWorkers", 4)),
 
     # GeoServer
     GEOSERVER_BASEURL=_cfg["GeoServer"]["BaseUrl"].rstrip("/"),
@@ -74,9 +136,68 @@ settings = _Settings(
     INDE_WORKSPACE=_get("INDE.Workspace", "inde"),
     INDE_DATASTORE=_get("INDE.Datastore", "inde_ds"),
 
+    # Resiliência / health check
+    BREAKER_FAILURE_THRESHOLD=int(_get("Health.BreakerFailureThreshold", 5)),
+    BREAKER_RESET_SECONDS=float(_get("Health.BreakerResetSeconds", 30.0)),
+    HEALTH_REFRESH_SECONDS=float(_get("Health.RefreshSeconds", 15.0)),
+
+    # Auth (JWT)
+    JWT_SECRET=_get("Auth.JwtSecret", "fauno_dev_secret_change_me"),
+    JWT_ISSUER=_get("Auth.JwtIssuer", "Fauno"),
+    JWT_AUDIENCE=_get("Auth.JwtAudience", "FaunoClient"),
+    JWT_EXPIRES_MINUTES=int(_get("Auth.JwtExpiresMinutes", 120)),
+    AUTH_TOKEN_CACHE_MAX_ITEMS=int(_get("Auth.TokenCacheMaxItems", 1024)),
+
     # Upload
     UPLOAD_TEMP_PATH=_get("Upload.TempPath"),
 
+    # Profiling sob demanda (upload/import/publish)
+    PROFILING_ENABLED=bool(_get("Profiling.Enabled", False)),
+    PROFILING_SAMPLE_RATE=float(_get("Profiling.SampleRate", 0.0)),
+    PROFILING_PATH=_get("Profiling.Path") or None,
+    PROFILING_RETENTION=int(_get("Profiling.Retention", 50)),
+    PROFILING_TOP_ALLOCATIONS=int(_get("Profiling.TopAllocations", 25)),
+
+    # Importação
+    IMPORT_REPROJECT_SECONDS_PER_MB=float(_get("Import.ReprojectSecondsPerMb", 0.05)),
+    IMPORT_PARALLELISM=int(_get("Import.Parallelism", 1)),
+    IMPORT_PARALLEL_MIN_FEATURES=int(_get("Import.ParallelMinFeatures", 500000)),
+
+    # Armazenamento particionado (layers grandes)
+    PARTITION_ENABLED=bool(_get("Partitioning.Enabled", False)),
+    PARTITION_MIN_FEATURES=int(_get("Partitioning.MinFeatures", 2000000)),
+    PARTITION_GRID_SIZE=float(_get("Partitioning.GridSize", 0.5)),
+    PARTITION_COLUMN=_get("Partitioning.Column") or None,
+    PARTITION_MAX_PARTITIONS=int(_get("Partitioning.MaxPartitions", 256)),
+
+    # Inspeção prévia de ZIP
+    INSPECT_CACHE_MAX_ITEMS=int(_get("Inspect.CacheMaxItems", 256)),
+    INSPECT_FEATURES_PER_SECOND=float(_get("Inspect.FeaturesPerSecond", 20000.0)),
+    INSPECT_MAX_FIELDS=int(_get("Inspect.MaxFields", 100)),
+
+    # Tiles (MVT)
+    TILES_CACHE_PATH=_get("Tiles.CachePath") or None,
+    TILES_CACHE_MAX_ITEMS=int(_get("Tiles.CacheMaxItems", 2048)),
+    TILES_EXTENT=int(_get("Tiles.Extent", 4096)),
+    TILES_BUFFER=int(_get("Tiles.Buffer", 64)),
+    TILES_SIMPLIFY_PIXELS=float(_get("Tiles.SimplifyPixels", 1.0)),
+    TILES_SIMPLIFY_MAX_ZOOM=int(_get("Tiles.SimplifyMaxZoom", 14)),
+    TILES_ATTRIBUTES_MIN_ZOOM=int(_get("Tiles.AttributesMinZoom", 10)),
+    TILES_MAX_AGE=int(_get("Tiles.MaxAge", 300)),
+
+    # Export
+    EXPORT_BATCH_SIZE=int(_get("Export.BatchSize", 5000)),
+
+    # Reconciliação GeoServer
+    RECONCILE_MAX_WORKERS=int(_get("Reconcile.MaxWorkers", 4)),
+
+    # Index advisor (índices de atributo)
+    INDEX_ADVISOR_AUTO_CREATE=bool(_get("IndexAdvisor.AutoCreate", False)),
+    INDEX_ADVISOR_INTERVAL_SECONDS=float(_get("IndexAdvisor.IntervalSeconds", 3600.0)),
+    INDEX_ADVISOR_MIN_CALLS=int(_get("IndexAdvisor.MinCalls", 50)),
+    INDEX_ADVISOR_MIN_ROWS=int(_get("IndexAdvisor.MinRows", 100000)),
+    INDEX_ADVISOR_BRIN_MIN_ROWS=int(_get("IndexAdvisor.BrinMinRows", 1000000)),
+
     # API
     API_TITLE=_get("Api.Title", "Fauno API"),
     API_VERSION=_get("Api.Version", "1.0.0"),
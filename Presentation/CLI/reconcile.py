@@ -0,0 +1,36 @@
+# Presentation/CLI/reconcile.py
+#Uso
+#export ENVIRONMENT=dev PYTHONPATH=$PWD
+#python -m Presentation.CLI.reconcile                # dry-run (só relatório)
+#python -m Presentation.CLI.reconcile --apply -j 8   # cria o que falta com 8 workers
+
+import argparse
+import json
+import sys
+
+from Presentation.API.settings import settings
+from Application.services.reconcile_service import ReconcileService
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Reconcilia o schema do Fauno com o GeoServer em uma passada.")
+    parser.add_argument("--workspace", default=settings.GEOSERVER_WORKSPACE)
+    parser.add_argument("--datastore", default=settings.GEOSERVER_DATASTORE)
+    parser.add_argument("--apply", action="store_true", help="Aplica as mudanças (padrão: dry-run)")
+    parser.add_argument("-j", "--max-workers", type=int, default=settings.RECONCILE_MAX_WORKERS)
+    args = parser.parse_args(argv)
+
+    service = ReconcileService.create_from_settings(settings)
+    report = service.reconcile(
+        workspace=args.workspace,
+        datastore=args.datastore,
+        dry_run=not args.apply,
+        max_workers=args.max_workers,
+    )
+    json.dump(report, sys.stdout, ensure_ascii=False, indent=2)
+    sys.stdout.write("\n")
+    return 1 if report["summary"]["failed"] or report["summary"]["check_failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())